@@ -0,0 +1,160 @@
+"""
+Load benchmark of the async API stack against the sync stack.
+
+Starts each stack under uvicorn in its own process, fires the same mix of
+requests at it from a pool of concurrent clients and reports p50/p99 latency
+and requests/sec. The sync stack is served by `sync_app` below: the same
+routes as api.main on the sync session and crud functions.
+
+Usage (from the repository root, with the warehouse loaded):
+    python -m api.benchmark --requests 2000 --concurrency 50 --channel tikvahpharma
+"""
+import time
+import argparse
+import statistics
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+import requests
+from fastapi import FastAPI, Depends
+from sqlalchemy.orm import Session
+
+from api.database import get_db
+from api import crud
+
+# Sync baseline: def endpoints on the sync session, run in FastAPI's threadpool
+sync_app = FastAPI(title="Medical Telegram Analytics API (sync baseline)")
+
+
+@sync_app.get("/api/reports/top-products")
+def top_products(limit: int = 10, db: Session = Depends(get_db)):
+    return crud.get_top_products(db, limit)
+
+
+@sync_app.get("/api/channels/{channel_name}/activity")
+def channel_activity(channel_name: str, db: Session = Depends(get_db)):
+    return crud.get_channel_activity(db, channel_name)
+
+
+@sync_app.get("/api/search/messages")
+def search_messages(query: str, limit: int = 20, db: Session = Depends(get_db)):
+    return crud.search_messages(db, query, limit)
+
+
+@sync_app.get("/api/reports/visual-content")
+def visual_content_stats(db: Session = Depends(get_db)):
+    return crud.get_visual_content_stats(db)
+
+
+STACKS = {
+    "sync": "api.benchmark:sync_app",
+    "async": "api.main:app",
+}
+
+
+def request_paths(channel: str, keyword: str) -> List[str]:
+    """The request mix, one path per endpoint."""
+    return [
+        "/api/reports/top-products?limit=10",
+        f"/api/channels/{channel}/activity",
+        f"/api/search/messages?query={keyword}&limit=20",
+        "/api/reports/visual-content",
+    ]
+
+
+def start_server(app: str, port: int) -> subprocess.Popen:
+    """Start uvicorn serving an app and wait until it answers."""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"]
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"http://127.0.0.1:{port}/docs", timeout=1)
+            return server
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"{app} did not start on port {port}")
+
+
+def run_load(base_url: str, paths: List[str], total: int, concurrency: int) -> Dict[str, Any]:
+    """
+    Send requests from concurrent clients and collect latency figures.
+
+    Args:
+        base_url: Server address.
+        paths: Request paths, used round-robin.
+        total: Number of requests.
+        concurrency: Concurrent clients.
+
+    Returns:
+        Dictionary of latency percentiles, throughput and error count.
+    """
+    per_client = total // concurrency
+
+    def client(offset: int) -> List[float]:
+        latencies = []
+        with requests.Session() as session:
+            for i in range(per_client):
+                path = paths[(offset + i) % len(paths)]
+                start = time.perf_counter()
+                response = session.get(base_url + path, timeout=60)
+                elapsed = time.perf_counter() - start
+                latencies.append(elapsed if response.status_code < 500 else -elapsed)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(client, range(concurrency)))
+    wall = time.perf_counter() - start
+
+    all_latencies = [latency for latencies in results for latency in latencies]
+    ok = sorted(latency for latency in all_latencies if latency >= 0)
+    quantiles = statistics.quantiles(ok, n=100) if len(ok) > 1 else [0.0] * 99
+
+    return {
+        "requests": len(all_latencies),
+        "errors": len(all_latencies) - len(ok),
+        "rps": round(len(all_latencies) / wall, 1),
+        "p50_ms": round(quantiles[49] * 1000, 1),
+        "p99_ms": round(quantiles[98] * 1000, 1),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments for the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the async API stack against the sync stack")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per stack")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent clients")
+    parser.add_argument("--channel", default="tikvahpharma", help="Channel used for the activity endpoint")
+    parser.add_argument("--keyword", default="paracetamol", help="Keyword used for the search endpoint")
+    parser.add_argument("--port", type=int, default=8765, help="Port the servers listen on")
+    parser.add_argument("--stacks", nargs="+", choices=list(STACKS), default=list(STACKS),
+                        help="Stacks to benchmark")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    paths = request_paths(args.channel, args.keyword)
+
+    rows = []
+    for name in args.stacks:
+        server = start_server(STACKS[name], args.port)
+        try:
+            # Warm up the connection pool before measuring
+            run_load(f"http://127.0.0.1:{args.port}", paths, args.concurrency, args.concurrency)
+            rows.append({"stack": name, **run_load(
+                f"http://127.0.0.1:{args.port}", paths, args.requests, args.concurrency
+            )})
+        finally:
+            server.terminate()
+            server.wait()
+
+    columns = list(rows[0].keys())
+    print("\t".join(columns))
+    for row in rows:
+        print("\t".join(str(row[column]) for column in columns))
@@ -0,0 +1,201 @@
+"""
+Latency benchmark of message search at warehouse scale.
+
+Builds a synthetic warehouse (1M messages by default) in a scratch schema:
+fct_messages with the same search vector and indexes the dbt model creates,
+plus dim_channels and dim_dates. It then times the endpoint's own search SQL,
+rendered by crud._search_query and pointed at the scratch schema, against
+the ILIKE query the endpoint ran before, and prints p50/p99 per query.
+
+Usage (from the repository root; the slow-query log is turned off since
+every baseline run would trip it):
+    API_SLOW_QUERY_MS=0 python -m api.benchmark_search --messages 1000000 --repeat 20
+"""
+import time
+import argparse
+import statistics
+from datetime import date
+from typing import List, Dict, Any
+
+from sqlalchemy import text
+
+from api.database import engine
+from api import crud
+
+SCHEMA = "search_benchmark"
+
+# Word ranks follow a skewed distribution, so low numbers are common terms
+BUILD_STATEMENTS = [
+    f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE",
+    f"CREATE SCHEMA {SCHEMA}",
+    f"""
+    CREATE TABLE {SCHEMA}.dim_channels AS
+    SELECT g AS channel_key, 'channel_' || g AS channel_name
+    FROM generate_series(1, 20) AS g
+    """,
+    f"""
+    CREATE TABLE {SCHEMA}.dim_dates AS
+    SELECT (DATE '2023-01-01' + g) AS full_date
+    FROM generate_series(0, 699) AS g
+    """,
+    f"""
+    CREATE TABLE {SCHEMA}.fct_messages AS
+    SELECT
+        *,
+        to_tsvector('simple', coalesce(message_text, '')) AS message_search_vector
+    FROM (
+        SELECT
+            g AS message_id,
+            (g % 20) + 1 AS channel_key,
+            DATE '2023-01-01' + (g % 700) AS date_key,
+            (random() * 20000)::int AS view_count,
+            (
+                SELECT string_agg('w' || floor(power(random(), 3) * 5000)::int, ' ')
+                FROM generate_series(1, 5 + (g % 30))
+            ) AS message_text
+        FROM generate_series(1, :messages) AS g
+    ) AS generated
+    """,
+    # Same indexes as the indexes config of models/marts/fct_messages.sql
+    f"CREATE INDEX ON {SCHEMA}.fct_messages USING gin (message_search_vector)",
+    f"CREATE INDEX ON {SCHEMA}.fct_messages (channel_key, date_key)",
+    f"ANALYZE {SCHEMA}.dim_channels",
+    f"ANALYZE {SCHEMA}.dim_dates",
+    f"ANALYZE {SCHEMA}.fct_messages",
+]
+
+# The search query the endpoint ran before full-text search, as a baseline
+LEGACY_ILIKE_QUERY = """
+    SELECT
+        m.message_id,
+        c.channel_name,
+        m.message_text,
+        d.full_date::text AS date
+    FROM raw_raw.fct_messages m
+    JOIN raw_raw.dim_channels c ON m.channel_key = c.channel_key
+    JOIN raw_raw.dim_dates d ON m.date_key = d.full_date
+    WHERE m.message_text ILIKE :keyword
+        {filters}
+    ORDER BY m.view_count DESC
+    LIMIT :limit
+"""
+
+LIMIT = 20
+
+CASES = [
+    {"name": "common term", "keyword": "w1"},
+    {"name": "rare term", "keyword": "w4321"},
+    {"name": "two terms", "keyword": "w12 w345"},
+    {"name": "prefix (typing)", "keyword": "w432"},
+    {
+        "name": "term + channel + dates",
+        "keyword": "w12",
+        "channel_name": "channel_3",
+        "date_from": date(2023, 3, 1),
+        "date_to": date(2023, 6, 30),
+    },
+    {"name": "rare term + channel", "keyword": "w4321", "channel_name": "channel_3"},
+    {"name": "two terms, next page", "keyword": "w12 w345", "next_page": True},
+]
+
+
+def in_scratch_schema(sql: str) -> str:
+    """Point a warehouse query at the scratch schema."""
+    return sql.replace("raw_raw.", f"{SCHEMA}.")
+
+
+def build_dataset(messages: int) -> None:
+    """Create the synthetic warehouse tables with their search vector and indexes."""
+    with engine.begin() as conn:
+        for statement in BUILD_STATEMENTS:
+            conn.execute(text(statement), {"messages": messages})
+
+
+def search_query(case: Dict[str, Any]):
+    """
+    The endpoint's search query and parameters for a case, on the scratch schema.
+
+    For a next-page case the first page is fetched to build the keyset
+    (rank, view_count, message_id, channel_name) of its last row, as the
+    endpoint's cursor does.
+    """
+    filters = (case["keyword"], LIMIT, case.get("channel_name"), case.get("date_from"), case.get("date_to"))
+    query, params = crud._search_query(*filters)
+    query = text(in_scratch_schema(query.text))
+
+    if case.get("next_page"):
+        with engine.connect() as conn:
+            last = conn.execute(query, params).fetchall()[-1]
+        query, params = crud._search_query(
+            *filters, after=(last.rank, last.view_count, last.message_id, last.channel_name)
+        )
+        query = text(in_scratch_schema(query.text))
+    return query, params
+
+
+def legacy_query(case: Dict[str, Any]):
+    """The pre-full-text ILIKE query for a case, with the same filters."""
+    filters = []
+    params = {"keyword": f"%{case['keyword']}%", "limit": LIMIT}
+    if case.get("channel_name"):
+        filters.append("AND c.channel_name = :channel")
+        params["channel"] = case["channel_name"]
+    if case.get("date_from"):
+        filters.append("AND m.date_key >= :date_from")
+        params["date_from"] = case["date_from"]
+    if case.get("date_to"):
+        filters.append("AND m.date_key <= :date_to")
+        params["date_to"] = case["date_to"]
+    if case.get("next_page"):
+        # Without cursors, the second page meant fetching both pages
+        params["limit"] = 2 * LIMIT
+    sql = LEGACY_ILIKE_QUERY.format(filters="\n        ".join(filters))
+    return text(in_scratch_schema(sql)), params
+
+
+def time_query(query, params: Dict[str, Any], repeat: int) -> List[float]:
+    """Run a query repeatedly and return its latencies in milliseconds."""
+    latencies = []
+    with engine.connect() as conn:
+        conn.execute(query, params).fetchall()  # warm up
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(query, params).fetchall()
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """p50/p99 of a list of latencies."""
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {"p50_ms": round(quantiles[49], 1), "p99_ms": round(quantiles[98], 1)}
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments for the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark ILIKE against indexed full-text message search")
+    parser.add_argument("--messages", type=int, default=1_000_000, help="Synthetic messages to generate")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query")
+    parser.add_argument("--reuse", action="store_true", help="Reuse the dataset from a previous run")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema afterwards")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if not args.reuse:
+        start = time.perf_counter()
+        build_dataset(args.messages)
+        print(f"Built {args.messages} messages in {time.perf_counter() - start:.1f}s")
+
+    try:
+        print("case\tmethod\tp50_ms\tp99_ms")
+        for case in CASES:
+            for method, (query, params) in (("ilike", legacy_query(case)), ("fulltext", search_query(case))):
+                result = summarize(time_query(query, params, args.repeat))
+                print(f"{case['name']}\t{method}\t{result['p50_ms']}\t{result['p99_ms']}")
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
@@ -0,0 +1,219 @@
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.config import (
+    CACHE_ENABLED,
+    CACHE_TTL_SECONDS,
+    CACHE_MAX_ENTRIES,
+    CACHE_REDIS_URL,
+    WAREHOUSE_VERSION_CHECK_SECONDS,
+    HTTP_CACHE_MAX_AGE,
+)
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # shared backend is optional
+    redis = None
+
+WAREHOUSE_VERSION_QUERY = text("SELECT version FROM raw.warehouse_version WHERE id = 1")
+
+
+class TTLCache:
+    """
+    In-process LRU cache whose entries also expire after a fixed TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResponseCache:
+    """
+    Cache of report responses keyed by endpoint, parameters and warehouse version.
+
+    The warehouse version (raw.warehouse_version, bumped by the pipeline after
+    dbt) is part of every key, so a refresh makes all cached responses stale at
+    once. The version itself is re-read at most every
+    WAREHOUSE_VERSION_CHECK_SECONDS. When CACHE_REDIS_URL is set and redis is
+    installed, responses are also shared through Redis between API processes.
+    """
+
+    def __init__(self):
+        self.local = TTLCache(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS)
+        self.shared = redis.from_url(CACHE_REDIS_URL) if (CACHE_REDIS_URL and redis) else None
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.version: Optional[int] = None
+        self._version_checked_at = 0.0
+        self._version_lock = asyncio.Lock()
+
+    async def warehouse_version(self, db: AsyncSession) -> int:
+        """
+        Get the current warehouse version, re-reading it when the last check is old.
+        """
+        if self.version is not None and time.monotonic() - self._version_checked_at < WAREHOUSE_VERSION_CHECK_SECONDS:
+            return self.version
+
+        async with self._version_lock:
+            if self.version is None or time.monotonic() - self._version_checked_at >= WAREHOUSE_VERSION_CHECK_SECONDS:
+                try:
+                    version = (await db.execute(WAREHOUSE_VERSION_QUERY)).scalar() or 0
+                except Exception:
+                    # No marker yet (pipeline never bumped it): treat as version 0
+                    await db.rollback()
+                    version = 0
+                if version != self.version:
+                    self.local.clear()
+                self.version = version
+                self._version_checked_at = time.monotonic()
+        return self.version
+
+    def make_key(self, endpoint: str, params: Dict[str, Any], version: int) -> str:
+        return f"api-cache:{version}:{endpoint}:{json.dumps(params, sort_keys=True, default=str)}"
+
+    async def get_or_compute(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        db: AsyncSession,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Return the cached response for endpoint+params, computing it on a miss.
+
+        Args:
+            endpoint: Name of the endpoint.
+            params: Request parameters that change the response.
+            db: Session used to read the warehouse version.
+            compute: Coroutine factory producing the response.
+        """
+        if not CACHE_ENABLED:
+            return await compute()
+
+        key = self.make_key(endpoint, params, await self.warehouse_version(db))
+
+        value = self.local.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        if self.shared is not None:
+            try:
+                payload = await self.shared.get(key)
+            except Exception as e:
+                print(f"Shared cache unavailable: {str(e)}")
+                payload = None
+            if payload is not None:
+                value = json.loads(payload)
+                self.local.set(key, value)
+                self.shared_hits += 1
+                return value
+
+        self.misses += 1
+        value = await compute()
+        self.local.set(key, value)
+
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, json.dumps(jsonable_encoder(value)), ex=int(CACHE_TTL_SECONDS))
+            except Exception as e:
+                print(f"Shared cache unavailable: {str(e)}")
+        return value
+
+    def etag(self, endpoint: str, params: Dict[str, Any], version: int) -> str:
+        """Strong ETag for a response: changes with the parameters and on every warehouse refresh."""
+        digest = hashlib.sha256(self.make_key(endpoint, params, version).encode("utf-8")).hexdigest()
+        return f'"{digest[:32]}"'
+
+    async def not_modified(
+        self,
+        request: Request,
+        response: Response,
+        endpoint: str,
+        params: Dict[str, Any],
+        db: AsyncSession
+    ) -> Optional[Response]:
+        """
+        Handle a conditional GET for endpoint+params.
+
+        Sets ETag and Cache-Control on the response. If the client's
+        If-None-Match already holds the current ETag, returns a 304 to send
+        instead; the version comes from the in-process copy, so an unchanged
+        poll normally doesn't touch Postgres at all.
+
+        Args:
+            request: Incoming request, read for If-None-Match.
+            response: Response the endpoint will return, given the headers.
+            endpoint: Name of the endpoint.
+            params: Request parameters that change the response.
+            db: Session used to read the warehouse version when it is due.
+
+        Returns:
+            A 304 response, or None if the endpoint should answer normally.
+        """
+        etag = self.etag(endpoint, params, await self.warehouse_version(db))
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={HTTP_CACHE_MAX_AGE}"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            # If-None-Match uses the weak comparison, so W/ prefixes added by proxies still match
+            candidates = [tag.strip() for tag in if_none_match.split(",")]
+            if "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates):
+                return Response(status_code=304, headers=headers)
+
+        response.headers.update(headers)
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "enabled": CACHE_ENABLED,
+            "backend": "local+redis" if self.shared is not None else "local",
+            "warehouse_version": self.version,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+            "entries": len(self.local),
+            "evictions": self.local.evictions,
+        }
+
+
+response_cache = ResponseCache()
@@ -1,6 +1,210 @@
+import re
+from datetime import date
+from typing import Optional, Tuple
+
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from api import schemas
+from api.config import STREAM_BATCH_SIZE, SEARCH_CANDIDATE_LIMIT, SEARCH_MIN_PREFIX_LENGTH
+
+# Queries are shared by the sync and async versions of each endpoint
+
+# Report queries read the pre-aggregated serving marts built by dbt
+# (mart_top_content, mart_channel_daily_activity, mart_channel_visual_stats),
+# so their cost doesn't grow with fct_messages
+
+TOP_PRODUCTS_QUERY = text("""
+    SELECT product, mentions
+    FROM raw_raw.mart_top_content
+    ORDER BY content_rank
+    LIMIT :limit
+""")
+
+# Pages continue after the last date of the previous page (keyset pagination)
+CHANNEL_ACTIVITY_QUERY = """
+    SELECT
+        activity_date::text AS date,
+        message_count
+    FROM raw_raw.mart_channel_daily_activity
+    WHERE channel_name = :channel
+        {after}
+    ORDER BY activity_date
+    LIMIT :limit
+"""
+
+# Ranked full-text search over the GIN-indexed message_search_vector built in
+# fct_messages. Every term must match, as a word prefix once it is
+# SEARCH_MIN_PREFIX_LENGTH characters long, so partial words typed into the
+# search box already find results; shorter terms match whole words, since a
+# short prefix expands to a large share of the vocabulary. The rank is float8
+# so it survives the round trip through a pagination cursor exactly.
+#
+# Matches are read in an inner query that touches fct_messages only: the
+# channel is resolved to its channel_key up front, so the (channel_key,
+# date_key) index can serve filtered searches. The inner query stops after
+# SEARCH_CANDIDATE_LIMIT matches, so ts_rank_cd only runs on that many rows
+# however common a term is; results are then ranked among those candidates.
+SEARCH_MESSAGES_QUERY = """
+    SELECT
+        m.message_id,
+        c.channel_name,
+        m.message_text,
+        d.full_date::text AS date,
+        m.view_count,
+        m.rank
+    FROM (
+        SELECT
+            m.message_id,
+            m.channel_key,
+            m.date_key,
+            m.message_text,
+            m.view_count,
+            ts_rank_cd(m.message_search_vector, q.query)::float8 AS rank
+        FROM raw_raw.fct_messages m
+        CROSS JOIN to_tsquery('simple', :tsquery) AS q(query)
+        WHERE m.message_search_vector @@ q.query
+            {filters}
+        {candidates}
+    ) m
+    JOIN raw_raw.dim_channels c ON m.channel_key = c.channel_key
+    JOIN raw_raw.dim_dates d ON m.date_key = d.full_date
+    {after}
+    ORDER BY m.rank DESC, m.view_count DESC, m.message_id DESC, c.channel_name DESC
+    LIMIT :limit
+"""
+
+SEARCH_CHANNEL_FILTER = (
+    "AND m.channel_key = (SELECT channel_key FROM raw_raw.dim_channels WHERE channel_name = :channel)"
+)
+
+# Keyset condition: rows that sort after the last row of the previous page
+SEARCH_AFTER_FILTER = (
+    "WHERE (m.rank, m.view_count, m.message_id, c.channel_name)"
+    " < (:after_rank, :after_views, :after_id, :after_channel)"
+)
+
+VISUAL_CONTENT_QUERY = text("""
+    SELECT channel_name, image_count, total_messages
+    FROM raw_raw.mart_channel_visual_stats
+    ORDER BY image_count DESC
+""")
+
+
+def _top_products(result):
+    # Convert Row objects to dictionaries, then to Pydantic models
+    return [
+        schemas.TopProduct(
+            product=row.product if row.product else "N/A",
+            mentions=int(row.mentions) if row.mentions else 0
+        )
+        for row in result
+    ]
+
+
+def _channel_activity(result):
+    return [
+        schemas.ChannelActivity(
+            date=str(row.date),
+            message_count=int(row.message_count)
+        )
+        for row in result
+    ]
+
+
+def to_prefix_tsquery(keyword: str) -> str:
+    """
+    Turn free search text into a tsquery matching every term as a prefix.
+
+    Terms shorter than SEARCH_MIN_PREFIX_LENGTH must match a whole word.
+
+    Only word characters are kept, so user input can never inject tsquery
+    operators. Returns an empty string when there is nothing to search for.
+    """
+    terms = re.findall(r"\w+", keyword.lower())
+    return " & ".join(
+        f"{term}:*" if len(term) >= SEARCH_MIN_PREFIX_LENGTH else term for term in terms
+    )
+
+
+def _channel_activity_query(channel_name: str, limit: Optional[int], after: Optional[date]):
+    params = {"channel": channel_name, "limit": limit}
+    condition = ""
+    if after:
+        condition = "AND activity_date > :after"
+        params["after"] = after
+    return text(CHANNEL_ACTIVITY_QUERY.format(after=condition)), params
+
+
+def _search_query(
+    keyword: str,
+    limit: Optional[int],
+    channel_name: Optional[str],
+    date_from: Optional[date],
+    date_to: Optional[date],
+    after: Optional[Tuple[float, int, int, str]] = None
+):
+    # Only add the filters that are used, so the planner sees a plain query
+    filters = []
+    params = {"tsquery": to_prefix_tsquery(keyword), "limit": limit}
+    if channel_name:
+        filters.append(SEARCH_CHANNEL_FILTER)
+        params["channel"] = channel_name
+    if date_from:
+        filters.append("AND m.date_key >= :date_from")
+        params["date_from"] = date_from
+    if date_to:
+        filters.append("AND m.date_key <= :date_to")
+        params["date_to"] = date_to
+
+    # Exports (no limit) rank every match
+    candidates = ""
+    if limit is not None and SEARCH_CANDIDATE_LIMIT:
+        candidates = "LIMIT :candidates"
+        params["candidates"] = max(SEARCH_CANDIDATE_LIMIT, limit)
+
+    after_filter = ""
+    if after:
+        after_filter = SEARCH_AFTER_FILTER
+        params.update(zip(("after_rank", "after_views", "after_id", "after_channel"), after))
+
+    query = text(SEARCH_MESSAGES_QUERY.format(
+        filters="\n            ".join(filters), candidates=candidates, after=after_filter
+    ))
+    return query, params
+
+
+def _message_search_results(result):
+    return [
+        schemas.MessageSearchResult(
+            message_id=int(row.message_id),
+            channel_name=str(row.channel_name),
+            message_text=str(row.message_text) if row.message_text else "",
+            date=str(row.date),
+            view_count=int(row.view_count),
+            rank=float(row.rank)
+        )
+        for row in result
+    ]
+
+
+async def _stream_rows(db: AsyncSession, query, params):
+    # yield_per makes the async session read through a server-side cursor,
+    # holding one batch of rows in memory at a time
+    result = await db.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE), params)
+    async for partition in result.mappings().partitions():
+        yield [dict(row) for row in partition]
+
+
+def _visual_content_stats(result):
+    return [
+        schemas.VisualContentStats(
+            channel_name=str(row.channel_name),
+            image_count=int(row.image_count) if row.image_count else 0,
+            total_messages=int(row.total_messages) if row.total_messages else 0
+        )
+        for row in result
+    ]
 
 # Endpoint 1 - top products
 def get_top_products(db: Session, limit: int = 10):
@@ -10,127 +214,155 @@ def get_top_products(db: Session, limit: int = 10):
     from message text using NLP or pattern matching.
     """
     try:
-        # Query from the fact table to get top messages by views
+        # Query the ranked top-content mart to get top messages by views
         # In a real implementation, you'd extract product names from message_text
-        query = text("""
-            SELECT 
-                SUBSTRING(message_text FROM 1 FOR 50) AS product,
-                view_count AS mentions
-            FROM raw_raw.fct_messages
-            WHERE message_text IS NOT NULL 
-                AND message_text != ''
-                AND view_count > 0
-            ORDER BY view_count DESC
-            LIMIT :limit
-        """)
-        result = db.execute(query, {"limit": limit}).fetchall()
-        
-        # Convert Row objects to dictionaries, then to Pydantic models
-        return [
-            schemas.TopProduct(
-                product=row.product if row.product else "N/A",
-                mentions=int(row.mentions) if row.mentions else 0
-            )
-            for row in result
-        ]
+        result = db.execute(TOP_PRODUCTS_QUERY, {"limit": limit}).fetchall()
+        return _top_products(result)
     except Exception as e:
         # Log the error and raise HTTPException
         print(f"Error in get_top_products: {str(e)}")
         raise
 
+async def get_top_products_async(db: AsyncSession, limit: int = 10):
+    """
+    Async version of get_top_products.
+    """
+    try:
+        result = (await db.execute(TOP_PRODUCTS_QUERY, {"limit": limit})).fetchall()
+        return _top_products(result)
+    except Exception as e:
+        print(f"Error in get_top_products_async: {str(e)}")
+        raise
+
 # Endpoint 2 - channel activity
-def get_channel_activity(db: Session, channel_name: str):
+def get_channel_activity(
+    db: Session,
+    channel_name: str,
+    limit: Optional[int] = None,
+    after: Optional[date] = None
+):
     """
     Get channel activity over time.
+    Returns up to limit days (all when None), starting after the given date.
     """
     try:
-        query = text("""
-            SELECT 
-                d.full_date::text AS date,
-                COUNT(m.message_id) AS message_count
-            FROM raw_raw.fct_messages m
-            JOIN raw_raw.dim_channels c ON m.channel_key = c.channel_key
-            JOIN raw_raw.dim_dates d ON m.date_key = d.full_date
-            WHERE c.channel_name = :channel
-            GROUP BY d.full_date
-            ORDER BY d.full_date
-        """)
-        result = db.execute(query, {"channel": channel_name}).fetchall()
-        
-        return [
-            schemas.ChannelActivity(
-                date=str(row.date),
-                message_count=int(row.message_count)
-            )
-            for row in result
-        ]
+        query, params = _channel_activity_query(channel_name, limit, after)
+        result = db.execute(query, params).fetchall()
+        return _channel_activity(result)
     except Exception as e:
         print(f"Error in get_channel_activity: {str(e)}")
         raise
 
+async def get_channel_activity_async(
+    db: AsyncSession,
+    channel_name: str,
+    limit: Optional[int] = None,
+    after: Optional[date] = None
+):
+    """
+    Async version of get_channel_activity.
+    """
+    try:
+        query, params = _channel_activity_query(channel_name, limit, after)
+        result = (await db.execute(query, params)).fetchall()
+        return _channel_activity(result)
+    except Exception as e:
+        print(f"Error in get_channel_activity_async: {str(e)}")
+        raise
+
+async def stream_channel_activity(db: AsyncSession, channel_name: str, after: Optional[date] = None):
+    """
+    Stream a channel's full activity history in batches of row dicts.
+    """
+    query, params = _channel_activity_query(channel_name, None, after)
+    async for batch in _stream_rows(db, query, params):
+        yield batch
+
 # Endpoint 3 - message search
-def search_messages(db: Session, keyword: str, limit: int = 10):
+def search_messages(
+    db: Session,
+    keyword: str,
+    limit: int = 10,
+    channel_name: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    after: Optional[Tuple[float, int, int, str]] = None
+):
     """
-    Search messages by keyword in message text.
+    Search messages by keywords, most relevant first.
+    All terms must occur (as word prefixes, or whole words if short); results can be narrowed to a
+    channel and a date range. Pass the (rank, view_count, message_id,
+    channel_name) of the last result as after to get the next page.
     """
     try:
-        query = text("""
-            SELECT 
-                m.message_id,
-                c.channel_name,
-                m.message_text,
-                d.full_date::text AS date
-            FROM raw_raw.fct_messages m
-            JOIN raw_raw.dim_channels c ON m.channel_key = c.channel_key
-            JOIN raw_raw.dim_dates d ON m.date_key = d.full_date
-            WHERE m.message_text ILIKE :keyword
-            ORDER BY m.view_count DESC
-            LIMIT :limit
-        """)
-        result = db.execute(
-            query,
-            {"keyword": f"%{keyword}%", "limit": limit}
-        ).fetchall()
-        
-        return [
-            schemas.MessageSearchResult(
-                message_id=int(row.message_id),
-                channel_name=str(row.channel_name),
-                message_text=str(row.message_text) if row.message_text else "",
-                date=str(row.date)
-            )
-            for row in result
-        ]
+        query, params = _search_query(keyword, limit, channel_name, date_from, date_to, after)
+        if not params["tsquery"]:
+            return []
+        result = db.execute(query, params).fetchall()
+        return _message_search_results(result)
     except Exception as e:
         print(f"Error in search_messages: {str(e)}")
         raise
 
+async def search_messages_async(
+    db: AsyncSession,
+    keyword: str,
+    limit: int = 10,
+    channel_name: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    after: Optional[Tuple[float, int, int, str]] = None
+):
+    """
+    Async version of search_messages.
+    """
+    try:
+        query, params = _search_query(keyword, limit, channel_name, date_from, date_to, after)
+        if not params["tsquery"]:
+            return []
+        result = (await db.execute(query, params)).fetchall()
+        return _message_search_results(result)
+    except Exception as e:
+        print(f"Error in search_messages_async: {str(e)}")
+        raise
+
+async def stream_search_messages(
+    db: AsyncSession,
+    keyword: str,
+    limit: Optional[int] = None,
+    channel_name: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    after: Optional[Tuple[float, int, int, str]] = None
+):
+    """
+    Stream search results in batches of row dicts; every match when limit is None.
+    """
+    query, params = _search_query(keyword, limit, channel_name, date_from, date_to, after)
+    if not params["tsquery"]:
+        return
+    async for batch in _stream_rows(db, query, params):
+        yield batch
+
 # Endpoint 4 - visual content stats
 def get_visual_content_stats(db: Session):
     """
     Get visual content statistics per channel.
     """
     try:
-        query = text("""
-            SELECT 
-                c.channel_name,
-                SUM(CASE WHEN m.has_image THEN 1 ELSE 0 END) AS image_count,
-                COUNT(*) AS total_messages
-            FROM raw_raw.fct_messages m
-            JOIN raw_raw.dim_channels c ON m.channel_key = c.channel_key
-            GROUP BY c.channel_name
-            ORDER BY image_count DESC
-        """)
-        result = db.execute(query).fetchall()
-        
-        return [
-            schemas.VisualContentStats(
-                channel_name=str(row.channel_name),
-                image_count=int(row.image_count) if row.image_count else 0,
-                total_messages=int(row.total_messages) if row.total_messages else 0
-            )
-            for row in result
-        ]
+        result = db.execute(VISUAL_CONTENT_QUERY).fetchall()
+        return _visual_content_stats(result)
     except Exception as e:
         print(f"Error in get_visual_content_stats: {str(e)}")
         raise
+
+async def get_visual_content_stats_async(db: AsyncSession):
+    """
+    Async version of get_visual_content_stats.
+    """
+    try:
+        result = (await db.execute(VISUAL_CONTENT_QUERY)).fetchall()
+        return _visual_content_stats(result)
+    except Exception as e:
+        print(f"Error in get_visual_content_stats_async: {str(e)}")
+        raise
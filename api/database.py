@@ -1,13 +1,55 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from api.config import DATABASE_URL
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from api.config import (
+    DATABASE_URL,
+    ASYNC_DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_STATEMENT_TIMEOUT_MS,
+    METRICS_ENABLED,
+)
+from api.metrics import instrument_engine, timed_pool
 
-engine = create_engine(DATABASE_URL)
+pool_settings = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_pre_ping": True,
+}
+
+# Sync stack (psycopg2)
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"},
+    poolclass=timed_pool(QueuePool, "sync") if METRICS_ENABLED else QueuePool,
+    **pool_settings
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async stack (asyncpg), used by the API endpoints
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args={"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}},
+    poolclass=timed_pool(AsyncAdaptedQueuePool, "async") if METRICS_ENABLED else AsyncAdaptedQueuePool,
+    **pool_settings
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Statement timing and slow-query log (see api.metrics)
+if METRICS_ENABLED:
+    instrument_engine(engine, "sync")
+    instrument_engine(async_engine.sync_engine, "async")
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
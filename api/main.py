@@ -1,17 +1,30 @@
-from fastapi import FastAPI, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
 import traceback
 
-from api.database import get_db
+from api.config import METRICS_ENABLED
+from api.database import get_async_db
+from api.cache import response_cache
+from api.metrics import MetricsMiddleware, render_metrics
+from api.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor, streaming_response
 from api import crud, schemas
 
+# "json" returns one page; "ndjson" and "csv" stream the whole result
+FORMAT_PATTERN = "^(json|ndjson|csv)$"
+
 app = FastAPI(
     title="Medical Telegram Analytics API",
     description="Analytical API exposing data warehouse insights",
     version="1.0.0"
 )
 
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 
 # endpoint 1 - top products
 
@@ -20,9 +33,21 @@ app = FastAPI(
     response_model=List[schemas.TopProduct],
     description="Returns the most frequently mentioned products"
 )
-def top_products(limit: int = 10, db: Session = Depends(get_db)):
+async def top_products(
+    request: Request,
+    response: Response,
+    limit: int = 10,
+    db: AsyncSession = Depends(get_async_db)
+):
     try:
-        return crud.get_top_products(db, limit)
+        params = {"limit": limit}
+        not_modified = await response_cache.not_modified(request, response, "top-products", params, db)
+        if not_modified:
+            return not_modified
+        return await response_cache.get_or_compute(
+            "top-products", params, db,
+            lambda: crud.get_top_products_async(db, limit)
+        )
     except Exception as e:
         error_msg = str(e)
         traceback.print_exc()
@@ -33,13 +58,43 @@ def top_products(limit: int = 10, db: Session = Depends(get_db)):
 @app.get(
     "/api/channels/{channel_name}/activity",
     response_model=List[schemas.ChannelActivity],
-    description="Returns posting activity over time for a channel"
+    description=(
+        "Returns posting activity over time for a channel. With a limit, the "
+        f"{NEXT_CURSOR_HEADER} response header holds the cursor of the next page; "
+        "format=ndjson or csv streams the whole history instead"
+    )
 )
-def channel_activity(channel_name: str, db: Session = Depends(get_db)):
+async def channel_activity(
+    channel_name: str,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern=FORMAT_PATTERN),
+    db: AsyncSession = Depends(get_async_db)
+):
+    after = decode_cursor(cursor, (date.fromisoformat,))[0] if cursor else None
+
+    if format != "json":
+        return streaming_response(
+            lambda stream_db: crud.stream_channel_activity(stream_db, channel_name, after),
+            format, f"{channel_name}-activity"
+        )
+
     try:
-        data = crud.get_channel_activity(db, channel_name)
-        if not data:
+        params = {"channel_name": channel_name, "limit": limit, "after": after}
+        not_modified = await response_cache.not_modified(request, response, "channel-activity", params, db)
+        if not_modified:
+            return not_modified
+        data = await response_cache.get_or_compute(
+            "channel-activity", params, db,
+            lambda: crud.get_channel_activity_async(db, channel_name, limit, after)
+        )
+        if not data and after is None:
             raise HTTPException(status_code=404, detail="Channel not found")
+        if limit and len(data) == limit:
+            last = jsonable_encoder(data[-1])
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor([last["date"]])
         return data
     except HTTPException:
         raise
@@ -52,11 +107,44 @@ def channel_activity(channel_name: str, db: Session = Depends(get_db)):
 @app.get(
     "/api/search/messages",
     response_model=List[schemas.MessageSearchResult],
-    description="Search messages by keyword"
+    description=(
+        "Ranked full-text search of messages; all terms must match as word prefixes "
+        "(terms under API_SEARCH_MIN_PREFIX_LENGTH characters as whole words). "
+        f"The {NEXT_CURSOR_HEADER} response header holds the cursor of the next page; "
+        "format=ndjson or csv streams every match (up to limit, if given) instead"
+    )
 )
-def search_messages(query: str, limit: int = 20, db: Session = Depends(get_db)):
+async def search_messages(
+    query: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1),
+    channel: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern=FORMAT_PATTERN),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Cursor is the sort key of the last result: rank, views, message id, channel
+    after = decode_cursor(cursor, (float, int, int, str)) if cursor else None
+
+    if format != "json":
+        return streaming_response(
+            lambda stream_db: crud.stream_search_messages(
+                stream_db, query, limit, channel, date_from, date_to, after
+            ),
+            format, "search-results"
+        )
+
+    limit = limit or 20
     try:
-        return crud.search_messages(db, query, limit)
+        results = await crud.search_messages_async(db, query, limit, channel, date_from, date_to, after)
+        if len(results) == limit:
+            last = results[-1]
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+                [last.rank, last.view_count, last.message_id, last.channel_name]
+            )
+        return results
     except Exception as e:
         error_msg = str(e)
         traceback.print_exc()
@@ -70,10 +158,42 @@ def search_messages(query: str, limit: int = 20, db: Session = Depends(get_db)):
     response_model=List[schemas.VisualContentStats],
     description="Returns image usage statistics per channel"
 )
-def visual_content_stats(db: Session = Depends(get_db)):
+async def visual_content_stats(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
     try:
-        return crud.get_visual_content_stats(db)
+        not_modified = await response_cache.not_modified(request, response, "visual-content", {}, db)
+        if not_modified:
+            return not_modified
+        return await response_cache.get_or_compute(
+            "visual-content", {}, db,
+            lambda: crud.get_visual_content_stats_async(db)
+        )
     except Exception as e:
         error_msg = str(e)
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Internal server error: {error_msg}")
+
+
+# cache statistics
+
+@app.get(
+    "/api/cache/stats",
+    response_model=schemas.CacheStats,
+    description="Returns hit/miss counters of the report response cache"
+)
+async def cache_stats():
+    return response_cache.stats()
+
+
+# metrics in the Prometheus text format
+
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False
+)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
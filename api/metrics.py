@@ -0,0 +1,247 @@
+import re
+import time
+import threading
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+from api.config import SLOW_QUERY_MS, METRICS_BUCKETS
+
+# Per-request state shared with the SQLAlchemy hooks: the ASGI scope (to
+# label statements with the matched route) and the time spent in the database
+_request_state: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_state", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """
+    Monotonic counter per label combination, rendered in Prometheus text format.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram per label combination, rendered in Prometheus text format.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = METRICS_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket..., count in +Inf only, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), series):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    bucket_labels = _format_labels(self.labelnames, labels, f'le="{le}"')
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+REQUESTS = Counter(
+    "api_requests_total", "HTTP requests served.", ("method", "route", "status")
+)
+REQUEST_DURATION = Histogram(
+    "api_request_duration_seconds", "Time to serve a request, body included.", ("method", "route")
+)
+REQUEST_DB_TIME = Histogram(
+    "api_request_db_seconds",
+    "Time a request spent in SQL statements and connection checkout; "
+    "the rest of api_request_duration_seconds is application and serialization time.",
+    ("method", "route")
+)
+STATEMENT_DURATION = Histogram(
+    "api_db_statement_duration_seconds", "Time to execute a SQL statement.", ("route", "operation")
+)
+POOL_CHECKOUT = Histogram(
+    "api_db_pool_checkout_seconds",
+    "Time to get a connection from the pool, including waits and new connections.",
+    ("engine",)
+)
+
+_engines: Dict[str, Any] = {}
+
+
+def _route(scope: Dict[str, Any]) -> str:
+    # The route template, not the raw path, so path parameters don't explode label cardinality
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _current_route() -> str:
+    state = _request_state.get()
+    return _route(state["scope"]) if state else "background"
+
+
+def _add_db_time(seconds: float) -> None:
+    state = _request_state.get()
+    if state is not None:
+        state["db_seconds"] += seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_start
+    route = _current_route()
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+    STATEMENT_DURATION.observe((route, operation), elapsed)
+    _add_db_time(elapsed)
+
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        sql = re.sub(r"\s+", " ", statement).strip()
+        print(f"Slow query ({elapsed * 1000:.0f} ms, route {route}): {sql} params={parameters!r:.1000}")
+
+
+def instrument_engine(engine, name: str) -> None:
+    """
+    Time every statement run on an engine and report its pool in /metrics.
+
+    Args:
+        engine: Sync engine (for an async engine, its sync_engine).
+        name: Engine label used in the metrics.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    _engines[name] = engine
+
+
+def timed_pool(pool_class, name: str):
+    """
+    Subclass a SQLAlchemy pool class so every checkout is timed.
+
+    Pool events only fire once a connection has been handed out, so the wait
+    for a free connection (and any new connection or pre-ping) is measured
+    around connect() instead.
+    """
+
+    class TimedPool(pool_class):
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                return super().connect()
+            finally:
+                elapsed = time.perf_counter() - start
+                POOL_CHECKOUT.observe((name,), elapsed)
+                _add_db_time(elapsed)
+
+    TimedPool.__name__ = f"Timed{pool_class.__name__}"
+    return TimedPool
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting requests and timing them per route.
+
+    Written against plain ASGI rather than BaseHTTPMiddleware so the timing
+    covers streamed bodies to the last chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = {"scope": scope, "db_seconds": 0.0}
+        token = _request_state.set(state)
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_state.reset(token)
+            route = _route(scope)
+            REQUESTS.inc((scope["method"], route, str(status["code"])))
+            REQUEST_DURATION.observe((scope["method"], route), elapsed)
+            REQUEST_DB_TIME.observe((scope["method"], route), state["db_seconds"])
+
+
+def render_metrics() -> str:
+    """
+    All metrics, plus current pool usage, in the Prometheus text exposition format.
+    """
+    lines: List[str] = []
+    for metric in (REQUESTS, REQUEST_DURATION, REQUEST_DB_TIME, STATEMENT_DURATION, POOL_CHECKOUT):
+        lines.extend(metric.render())
+
+    lines.append("# HELP api_db_pool_checked_out Connections currently checked out of the pool.")
+    lines.append("# TYPE api_db_pool_checked_out gauge")
+    for name, engine in sorted(_engines.items()):
+        lines.append(f'api_db_pool_checked_out{{engine="{name}"}} {engine.pool.checkedout()}')
+
+    lines.append("# HELP api_db_pool_size Connections the pool keeps open.")
+    lines.append("# TYPE api_db_pool_size gauge")
+    for name, engine in sorted(_engines.items()):
+        lines.append(f'api_db_pool_size{{engine="{name}"}} {engine.pool.size()}')
+
+    return "\n".join(lines) + "\n"
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 
 class TopProduct(BaseModel):
@@ -19,8 +19,21 @@ class MessageSearchResult(BaseModel):
     channel_name: str
     message_text: str
     date: str
+    view_count: int
+    rank: float
 
 class VisualContentStats(BaseModel):
     channel_name: str
     image_count: int
     total_messages: int
+
+class CacheStats(BaseModel):
+    enabled: bool
+    backend: str
+    warehouse_version: Optional[int]
+    hits: int
+    shared_hits: int
+    misses: int
+    hit_ratio: float
+    entries: int
+    evictions: int
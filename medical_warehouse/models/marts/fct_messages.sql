@@ -1,3 +1,11 @@
+{{ config(
+    indexes=[
+        {'columns': ['message_search_vector'], 'type': 'gin'},
+        {'columns': ['channel_key', 'date_key']}
+    ],
+    post_hook=["ANALYZE {{ this }}"]
+) }}
+
 SELECT
     m.message_id,
     c.channel_key,
@@ -10,7 +18,9 @@ SELECT
     CASE
         WHEN m.has_image THEN m.message_id || '.jpg'
         ELSE NULL
-    END AS image_name
+    END AS image_name,
+    -- Full-text search document; 'simple' keeps Amharic and English words unstemmed
+    TO_TSVECTOR('simple', COALESCE(m.message_text, '')) AS message_search_vector
 FROM {{ ref('stg_telegram_messages') }} AS m
 LEFT JOIN {{ ref('dim_channels') }} AS c
     ON m.channel_name = c.channel_name
@@ -0,0 +1,20 @@
+{{ config(
+    indexes=[{'columns': ['channel_name', 'activity_date'], 'unique': True}],
+    post_hook=["ANALYZE {{ this }}"]
+) }}
+
+-- Serving mart for GET /api/channels/{channel}/activity: one row per channel
+-- and day, so the endpoint reads a single index range instead of grouping
+-- the channel's messages at request time
+
+SELECT
+    c.channel_name,
+    d.full_date AS activity_date,
+    COUNT(m.message_id) AS message_count,
+    SUM(m.view_count) AS total_views
+FROM {{ ref('fct_messages') }} AS m
+JOIN {{ ref('dim_channels') }} AS c
+    ON m.channel_key = c.channel_key
+JOIN {{ ref('dim_dates') }} AS d
+    ON m.date_key = d.full_date
+GROUP BY c.channel_name, d.full_date
@@ -0,0 +1,15 @@
+{{ config(
+    indexes=[{'columns': ['channel_name'], 'unique': True}],
+    post_hook=["ANALYZE {{ this }}"]
+) }}
+
+-- Serving mart for GET /api/reports/visual-content: image usage per channel
+
+SELECT
+    c.channel_name,
+    SUM(CASE WHEN m.has_image THEN 1 ELSE 0 END) AS image_count,
+    COUNT(*) AS total_messages
+FROM {{ ref('fct_messages') }} AS m
+JOIN {{ ref('dim_channels') }} AS c
+    ON m.channel_key = c.channel_key
+GROUP BY c.channel_name
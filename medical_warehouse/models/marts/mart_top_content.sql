@@ -0,0 +1,19 @@
+{{ config(
+    indexes=[{'columns': ['content_rank'], 'unique': True}],
+    post_hook=["ANALYZE {{ this }}"]
+) }}
+
+-- Serving mart for GET /api/reports/top-products: messages ranked by views,
+-- trimmed to the columns the endpoint returns, so a top-N request reads
+-- the first N entries of the content_rank index
+
+SELECT
+    ROW_NUMBER() OVER (ORDER BY view_count DESC, message_id, channel_key) AS content_rank,
+    message_id,
+    channel_key,
+    SUBSTRING(message_text FROM 1 FOR 50) AS product,
+    view_count AS mentions
+FROM {{ ref('fct_messages') }}
+WHERE message_text IS NOT NULL
+    AND message_text != ''
+    AND view_count > 0
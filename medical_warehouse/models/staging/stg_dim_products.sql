@@ -1,33 +1,49 @@
 -- models/staging/stg_dim_products.sql
 -- Extract distinct products from YOLO detections
--- This model depends on YOLO detection data being available
+-- Products are the detected classes of per-box detections, paired with the
+-- category of the image they were found in. Images only loaded from the
+-- image-level CSV (the default YOLO output) contribute their comma-separated
+-- detected objects instead.
 
-with yolo_source as (
-    -- Use stg_yolo_detections if available, otherwise return empty result
-    select
-        detected_objects,
-        image_category as category
-    from {{ ref('stg_yolo_detections') }}
-    where detected_objects is not null
-        and detected_objects != ''
-        and detected_objects != '[]'
+with box_products as (
+    select distinct
+        b.class_name as product_name,
+        d.image_category as category
+    from {{ ref('stg_yolo_boxes') }} b
+    join {{ ref('stg_yolo_detections') }} d
+        on d.channel_name = b.channel_name
+        and d.image_name = b.image_name
+    where b.class_name is not null
+        and b.class_name != ''
 ),
 
 -- Split comma-separated detected objects into individual products
-expanded_products as (
-    select
-        trim(unnest(string_to_array(detected_objects, ','))) as product_name,
+csv_products as (
+    select distinct
+        lower(trim(product_name)) as product_name,
         category
-    from yolo_source
-    where detected_objects is not null
+    from (
+        select
+            unnest(string_to_array(detected_objects, ',')) as product_name,
+            image_category as category
+        from {{ ref('stg_yolo_detections') }}
+        where detection_source = 'csv'
+            and detected_objects is not null
+            and detected_objects != '[]'
+    ) expanded
+    where trim(product_name) != ''
+        and trim(product_name) != '[]'
+),
+
+products as (
+    select product_name, category from box_products
+    union
+    select product_name, category from csv_products
 )
 
-select distinct
+select
     row_number() over (order by product_name, category) as product_id,
-    lower(trim(product_name)) as product_name,
+    product_name,
     category
-from expanded_products
-where product_name is not null
-    and trim(product_name) != ''
-    and trim(product_name) != '[]'
+from products
 order by product_id
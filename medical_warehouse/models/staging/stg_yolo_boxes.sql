@@ -0,0 +1,57 @@
+-- models/staging/stg_yolo_boxes.sql
+-- One row per object box detected by YOLO (streamed by yolo_detect.py --output postgres)
+-- Empty until a YOLO loader has created raw.yolo_boxes
+
+{% set boxes_table = adapter.get_relation(database=target.database, schema='raw', identifier='yolo_boxes') %}
+
+with source as (
+
+    {% if boxes_table is not none %}
+    select
+        channel_name,
+        image_name,
+        box_index,
+        class_id,
+        class_name,
+        confidence,
+        x1,
+        y1,
+        x2,
+        y2
+    from {{ boxes_table }}
+    {% else %}
+    select
+        null::text as channel_name,
+        null::text as image_name,
+        null::smallint as box_index,
+        null::smallint as class_id,
+        null::text as class_name,
+        null::real as confidence,
+        null::real as x1,
+        null::real as y1,
+        null::real as x2,
+        null::real as y2
+    where false
+    {% endif %}
+
+)
+
+select
+    -- image identifier (file names repeat across channels)
+    channel_name::text as channel_name,
+    image_name::text as image_name,
+    box_index::integer as box_index,
+
+    -- detected class
+    class_id::integer as class_id,
+    lower(class_name)::text as class_name,
+    confidence::numeric as confidence,
+
+    -- bounding box in original image pixels
+    x1::numeric as x1,
+    y1::numeric as y1,
+    x2::numeric as x2,
+    y2::numeric as y2,
+    ((x2 - x1) * (y2 - y1))::numeric as box_area
+
+from source
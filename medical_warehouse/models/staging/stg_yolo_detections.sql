@@ -1,17 +1,63 @@
-with source as (
+-- models/staging/stg_yolo_detections.sql
+-- One row per image: summarized from per-box detections where available,
+-- falling back to the image-level CSV load (raw.yolo_detections)
 
+{% set images_table = adapter.get_relation(database=target.database, schema='raw', identifier='yolo_images') %}
+
+with box_summary as (
+
+    {% if images_table is not none %}
+    -- Mirrors classify_image in src/yolo_detect.py
     select
-        image_name,
-        detected_objects,
-        image_category,
-        confidence_score
-    from raw.yolo_detections
+        i.channel_name,
+        i.image_name,
+        string_agg(distinct b.class_name, ',' order by b.class_name) as detected_objects,
+        coalesce(bool_or(b.class_name = 'person'), false) as has_person,
+        coalesce(bool_or(b.class_name in ('bottle', 'cup', 'container')), false) as has_product,
+        coalesce(round(avg(b.confidence), 3), 0.0) as confidence_score
+    from {{ images_table }} i
+    left join {{ ref('stg_yolo_boxes') }} b
+        on b.channel_name = i.channel_name
+        and b.image_name = i.image_name
+    group by i.channel_name, i.image_name
+    {% else %}
+    -- No per-box load has run yet (raw.yolo_images is created by the YOLO loaders)
+    select
+        null::text as channel_name,
+        null::text as image_name,
+        null::text as detected_objects,
+        null::boolean as has_person,
+        null::boolean as has_product,
+        null::numeric as confidence_score
+    where false
+    {% endif %}
 
 ),
 
-cleaned as (
+from_boxes as (
 
     select
+        channel_name::text as channel_name,
+        image_name::text as image_name,
+        detected_objects::text as detected_objects,
+        case
+            when has_person and has_product then 'promotional'
+            when has_product then 'product_display'
+            when has_person then 'lifestyle'
+            else 'other'
+        end::text as image_category,
+        confidence_score::numeric as confidence_score,
+        'boxes'::text as detection_source
+    from box_summary
+
+),
+
+csv_rows as (
+
+    select
+        -- the CSV has no channel column
+        null::text as channel_name,
+
         -- image identifier
         image_name::text as image_name,
 
@@ -22,11 +68,32 @@ cleaned as (
         lower(image_category)::text as image_category,
 
         -- ensure numeric confidence
-        confidence_score::numeric as confidence_score
+        confidence_score::numeric as confidence_score,
+
+        'csv'::text as detection_source
+
+    from raw.yolo_detections
+
+),
+
+from_csv as (
+
+    -- Per-box rows win; the CSV has no channel, so they match on image name
+    select c.*
+    from csv_rows c
+    where not exists (
+        select 1
+        from from_boxes b
+        where b.image_name = c.image_name
+    )
 
-    from source
 )
 
 select *
-from cleaned
+from from_boxes
+
+union all
+
+select *
+from from_csv
 where image_name is not null
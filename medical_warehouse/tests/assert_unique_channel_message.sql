@@ -0,0 +1,8 @@
+-- Telegram message ids are only unique within a channel
+SELECT
+    channel_key,
+    message_id,
+    COUNT(*) AS occurrences
+FROM {{ ref('fct_messages') }}
+GROUP BY channel_key, message_id
+HAVING COUNT(*) > 1
@@ -36,6 +36,11 @@ def run_dbt_transformations():
         ["dbt", "run"],
         cwd="medical_warehouse"
     )
+    # Only reached if dbt succeeded; invalidates the API's cached reports
+    subprocess.check_call([
+        sys.executable,
+        "src/warehouse_version.py"
+    ])
 
 @op(
     tags={"kind": "enrichment", "component": "yolo"},
@@ -0,0 +1,142 @@
+"""
+Offline throughput benchmark for the Telegram scraper.
+
+Runs scrape_channel and main against FakeTelegramClient in a temporary data
+lake and reports messages/sec, images/sec and peak Python memory, so scraper
+changes can be measured without a live Telegram session.
+
+Usage:
+    python src/benchmark_scraper.py --channels 10 --messages 2000 --latency 0.05
+"""
+import time
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Dict, Any, Callable, Awaitable
+
+# The scraper logs to logs/ on import
+Path("logs").mkdir(exist_ok=True)
+
+import scraper
+from config import DataPathsConfig, ScraperConfig
+from fake_telegram import FakeTelegramClient
+
+
+def use_temporary_data_lake(root: Path) -> None:
+    """Point the scraper's data lake, images and checkpoints at a scratch directory."""
+    DataPathsConfig.MESSAGE_PATH = root / "telegram_messages"
+    DataPathsConfig.IMAGE_PATH = root / "images"
+    DataPathsConfig.CHECKPOINT_PATH = root / "checkpoints"
+
+
+async def measure(
+    name: str,
+    client: FakeTelegramClient,
+    run: Callable[[], Awaitable[int]]
+) -> Dict[str, Any]:
+    """
+    Time one scraper run and collect throughput and memory figures.
+
+    Args:
+        name: Label of the benchmark case.
+        client: Fake client the run scrapes from.
+        run: Coroutine factory performing the scrape and returning the message count.
+
+    Returns:
+        Dictionary of benchmark results.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    messages = await run()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "case": name,
+        "messages": messages,
+        "images": client.downloads,
+        "seconds": round(elapsed, 2),
+        "messages_per_sec": round(messages / elapsed, 1) if elapsed else 0.0,
+        "images_per_sec": round(client.downloads / elapsed, 1) if elapsed else 0.0,
+        "peak_mb": round(peak / 1024 / 1024, 1),
+        "requests": client.requests,
+        "flood_waits": client.flood_waits,
+    }
+
+
+def make_client(args: argparse.Namespace, channels: Dict[str, int]) -> FakeTelegramClient:
+    """Build a fake client from the command line options."""
+    return FakeTelegramClient(
+        channels,
+        media_ratio=args.media_ratio,
+        photo_bytes=args.photo_bytes,
+        request_latency=args.latency,
+        download_latency=args.download_latency,
+        flood_wait_every=args.flood_wait_every,
+        flood_wait_seconds=args.flood_wait_seconds
+    )
+
+
+async def run_benchmarks(args: argparse.Namespace) -> None:
+    """Run the scrape_channel and main benchmark cases and print a summary."""
+    channels = {f"bench_channel_{i}": args.messages for i in range(args.channels)}
+    ScraperConfig.INITIAL_SCRAPE_LIMIT = args.messages
+    if args.max_rate:
+        ScraperConfig.RATE_LIMIT_MAX_RATE = args.max_rate
+        ScraperConfig.RATE_LIMIT_BURST = max(ScraperConfig.RATE_LIMIT_BURST, int(args.max_rate))
+
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temporary_data_lake(Path(tmp) / "single")
+        first_channel = next(iter(channels))
+        client = make_client(args, {first_channel: args.messages})
+        results.append(await measure(
+            "scrape_channel",
+            client,
+            lambda: scraper.scrape_channel(client, first_channel)
+        ))
+
+    for concurrency in sorted({1, args.concurrency}):
+        with tempfile.TemporaryDirectory() as tmp:
+            use_temporary_data_lake(Path(tmp) / "main")
+            client = make_client(args, channels)
+            results.append(await measure(
+                f"main (concurrency={concurrency})",
+                client,
+                lambda: scraper.main(
+                    concurrency=concurrency,
+                    channels=list(channels),
+                    client=client
+                )
+            ))
+
+    columns = list(results[0].keys())
+    print("\t".join(columns))
+    for result in results:
+        print("\t".join(str(result[column]) for column in columns))
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments for the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against an offline Telegram stand-in")
+    parser.add_argument("--channels", type=int, default=5, help="Number of synthetic channels")
+    parser.add_argument("--messages", type=int, default=1000, help="Messages per channel")
+    parser.add_argument("--media-ratio", type=float, default=0.3, help="Fraction of messages with a photo")
+    parser.add_argument("--photo-bytes", type=int, default=50_000, help="Size of each synthetic photo")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per history request")
+    parser.add_argument("--download-latency", type=float, default=0.05, help="Seconds per media download")
+    parser.add_argument("--flood-wait-every", type=int, default=0, help="Inject a FloodWait every N calls")
+    parser.add_argument("--flood-wait-seconds", type=int, default=1, help="Seconds carried by injected FloodWaits")
+    parser.add_argument("--concurrency", type=int, default=ScraperConfig.MAX_CONCURRENT_CHANNELS,
+                        help="Channel concurrency compared against sequential scraping")
+    parser.add_argument("--max-rate", type=float, default=None,
+                        help="Override the rate limiter's maximum calls per second")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmarks(parse_args()))
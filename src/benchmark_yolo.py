@@ -0,0 +1,218 @@
+"""
+Speed and agreement benchmark for the fast YOLO categorization mode.
+
+Reads every image once so both passes start with a warm page cache, then
+runs the full detection pass and the fast categorization pass over the same
+images and reports images/sec for both, how many images the fast pass
+escalated, and how often both passes agree on the image category and on the
+category-relevant objects, with a category confusion table.
+
+With --check-batching it instead checks that batched inference returns the
+same boxes, in original image pixels, as one image per call.
+
+Usage:
+    python src/benchmark_yolo.py --limit 500 --batch-size 16
+    python src/benchmark_yolo.py --limit 200 --batch-size 16 --check-batching
+"""
+import time
+import argparse
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+from config import YoloConfig
+import yolo_detect
+
+
+def timed(run) -> Tuple[Any, float]:
+    """Call run() and return its result with the elapsed seconds."""
+    start = time.perf_counter()
+    result = run()
+    return result, time.perf_counter() - start
+
+
+def warm_page_cache(image_paths: list) -> int:
+    """
+    Read every image once so neither timed pass pays for cold disk reads.
+
+    Returns:
+        Bytes read.
+    """
+    total = 0
+    for image_path in image_paths:
+        with open(image_path, "rb") as f:
+            while True:
+                chunk = f.read(1 << 20)
+                if not chunk:
+                    break
+                total += len(chunk)
+    return total
+
+
+def category_objects(detected_objects: str) -> frozenset:
+    """Objects of a result row that classify_image looks at."""
+    objects = set(filter(None, detected_objects.split(",")))
+    return frozenset(objects & (yolo_detect.PERSON_OBJECTS | yolo_detect.PRODUCT_OBJECTS))
+
+
+def agreement_report(full: List[list], fast: List[list]) -> Dict[str, Any]:
+    """
+    Compare fast-mode rows against full-pass rows for the same images.
+
+    Args:
+        full: Result rows of the full pass.
+        fast: Result rows of the fast pass, in the same order.
+
+    Returns:
+        Dictionary with agreement rates and a category confusion counter.
+    """
+    confusion = Counter()
+    same_category = same_objects = 0
+
+    for full_row, fast_row in zip(full, fast):
+        confusion[(full_row[2], fast_row[2])] += 1
+        same_category += full_row[2] == fast_row[2]
+        same_objects += category_objects(full_row[1]) == category_objects(fast_row[1])
+
+    images = len(full) or 1
+    return {
+        "category_agreement": round(same_category / images, 4),
+        "object_agreement": round(same_objects / images, 4),
+        "confusion": confusion,
+    }
+
+
+def boxes_match(single: list, batched: list, tolerance: float) -> bool:
+    """
+    Compare the extract_boxes output of one image from two runs.
+
+    Args:
+        single: Boxes from the one-image-per-call run.
+        batched: Boxes from the batched run.
+        tolerance: Largest allowed difference in pixels and in confidence x 100.
+
+    Returns:
+        True if both runs found the same classes at the same places.
+    """
+    if len(single) != len(batched):
+        return False
+    by_position = lambda box: box[4:]
+    for single_box, batched_box in zip(sorted(single, key=by_position), sorted(batched, key=by_position)):
+        if single_box[1] != batched_box[1]:
+            return False
+        if abs(single_box[3] - batched_box[3]) * 100 > tolerance:
+            return False
+        if any(abs(a - b) > tolerance for a, b in zip(single_box[4:], batched_box[4:])):
+            return False
+    return True
+
+
+def check_batching(image_paths: list, model, args: argparse.Namespace) -> int:
+    """
+    Run images one per call and batched, and report images whose boxes differ.
+
+    Returns:
+        Number of images whose boxes differ.
+    """
+    runs = []
+    for batch_size in (1, args.batch_size):
+        boxes = {}
+        for position, _, detections in yolo_detect.predict_images(
+            image_paths, model, batch_size, args.prefetch_workers
+        ):
+            boxes[position] = yolo_detect.extract_boxes(detections, model.names)
+        runs.append(boxes)
+
+    single, batched = runs
+    mismatched = [
+        image_paths[position] for position in sorted(single)
+        if not boxes_match(single[position], batched.get(position, []), args.tolerance)
+    ]
+    for image_path in mismatched[:20]:
+        print(f"boxes differ\t{image_path}")
+    print(f"images\t{len(single)}")
+    print(f"mismatched\t{len(mismatched)}")
+    return len(mismatched)
+
+
+def run_benchmark(args: argparse.Namespace) -> None:
+    """Run both passes and print throughput and agreement."""
+    if args.fast_image_size:
+        YoloConfig.FAST_IMAGE_SIZE = args.fast_image_size
+    if args.escalate_confidence is not None:
+        YoloConfig.FAST_ESCALATE_CONFIDENCE = args.escalate_confidence
+
+    image_paths = yolo_detect.collect_image_paths()
+    if args.limit:
+        image_paths = image_paths[:args.limit]
+    if not image_paths:
+        print("No images found under", yolo_detect.IMAGE_DIR)
+        return
+
+    model = yolo_detect.get_model()
+    # Warm up so model setup isn't charged to the first pass
+    list(yolo_detect.predict_images(image_paths[:1], model, 1, 1))
+    # The full pass runs first; without this, the fast pass would find
+    # every image already in the page cache
+    warmed = warm_page_cache(image_paths)
+    print(f"Read {len(image_paths)} images ({warmed / 1024 / 1024:.1f} MB) into the page cache before timing")
+
+    if args.check_batching:
+        check_batching(image_paths, model, args)
+        return
+
+    full, full_seconds = timed(lambda: yolo_detect.detect_images_local(
+        image_paths, args.batch_size, args.prefetch_workers
+    ))
+    (fast, escalated), fast_seconds = timed(lambda: yolo_detect.categorize_fast(
+        image_paths, model, args.batch_size, args.prefetch_workers
+    ))
+
+    full_rows = [row for _, row in full]
+    fast_rows = [row for _, row in fast]
+    report = agreement_report(full_rows, fast_rows)
+
+    results = [
+        {"pass": "full", "images": len(full_rows), "seconds": round(full_seconds, 2),
+         "images_per_sec": round(len(full_rows) / full_seconds, 1) if full_seconds else 0.0,
+         "escalated": 0},
+        {"pass": f"fast (imgsz={YoloConfig.FAST_IMAGE_SIZE})", "images": len(fast_rows),
+         "seconds": round(fast_seconds, 2),
+         "images_per_sec": round(len(fast_rows) / fast_seconds, 1) if fast_seconds else 0.0,
+         "escalated": escalated},
+    ]
+    columns = list(results[0].keys())
+    print("\t".join(columns))
+    for result in results:
+        print("\t".join(str(result[column]) for column in columns))
+
+    print()
+    print(f"speedup\t{round(full_seconds / fast_seconds, 2) if fast_seconds else 0.0}")
+    print(f"category_agreement\t{report['category_agreement']}")
+    print(f"object_agreement\t{report['object_agreement']}")
+
+    print()
+    print("full_category\tfast_category\timages")
+    for (full_category, fast_category), count in sorted(report["confusion"].items()):
+        print(f"{full_category}\t{fast_category}\t{count}")
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments for the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark fast YOLO categorization against the full pass")
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N images")
+    parser.add_argument("--batch-size", type=int, default=YoloConfig.BATCH_SIZE, help="Images per inference call")
+    parser.add_argument("--prefetch-workers", type=int, default=YoloConfig.PREFETCH_WORKERS,
+                        help="Threads decoding images ahead of inference")
+    parser.add_argument("--fast-image-size", type=int, default=None,
+                        help="Override the fast pass input size")
+    parser.add_argument("--escalate-confidence", type=float, default=None,
+                        help="Override the confidence below which images are escalated")
+    parser.add_argument("--check-batching", action="store_true",
+                        help="Check that batched and one-image runs return the same boxes")
+    parser.add_argument("--tolerance", type=float, default=1.0,
+                        help="Pixels (and confidence points) batched boxes may differ by")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    run_benchmark(parse_args())
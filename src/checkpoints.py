@@ -0,0 +1,98 @@
+"""
+Per-channel scrape checkpoints for the Telegram scraper.
+
+Each channel keeps a small JSON file recording the newest message already
+scraped (the high-water mark used by incremental runs) and the oldest message
+reached by backfill, so both modes can resume where the last run stopped.
+"""
+import os
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any
+
+from config import DataPathsConfig
+
+
+def checkpoint_file(channel_name: str) -> Path:
+    """
+    Get the checkpoint file path for a channel.
+
+    Args:
+        channel_name: Name of the channel.
+
+    Returns:
+        Path to the channel's checkpoint file.
+    """
+    return DataPathsConfig.CHECKPOINT_PATH / f"{channel_name}.json"
+
+
+def load_checkpoint(channel_name: str) -> Dict[str, Any]:
+    """
+    Load the checkpoint for a channel.
+
+    Args:
+        channel_name: Name of the channel.
+
+    Returns:
+        Checkpoint dictionary, empty if the channel has never been scraped.
+    """
+    file_path = checkpoint_file(channel_name)
+    if not file_path.exists():
+        return {}
+
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning(f"Ignoring unreadable checkpoint {file_path}: {e}")
+        return {}
+
+
+def save_checkpoint(channel_name: str, checkpoint: Dict[str, Any]) -> None:
+    """
+    Persist the checkpoint for a channel atomically.
+
+    The checkpoint is written to a temporary file and renamed over the old
+    one, so a crash never leaves a half-written checkpoint behind.
+
+    Args:
+        channel_name: Name of the channel.
+        checkpoint: Checkpoint dictionary to save.
+    """
+    file_path = checkpoint_file(channel_name)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    checkpoint["updated_at"] = datetime.now().isoformat()
+    tmp_path = file_path.with_suffix(".json.tmp")
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, file_path)
+
+
+def advance_checkpoint(checkpoint: Dict[str, Any], messages: List[Dict[str, Any]]) -> None:
+    """
+    Advance a checkpoint past a batch of scraped messages.
+
+    Moves the high-water mark up to the newest message and the backfill
+    cursor down to the oldest message seen so far.
+
+    Args:
+        checkpoint: Checkpoint dictionary, updated in place.
+        messages: Message dictionaries that were saved to the data lake.
+    """
+    if not messages:
+        return
+
+    newest = max(messages, key=lambda m: m["message_id"])
+    oldest = min(messages, key=lambda m: m["message_id"])
+
+    if newest["message_id"] > checkpoint.get("last_message_id", 0):
+        checkpoint["last_message_id"] = newest["message_id"]
+        checkpoint["last_message_date"] = newest["message_date"]
+
+    backfill_offset_id = checkpoint.get("backfill_offset_id")
+    if backfill_offset_id is None or oldest["message_id"] < backfill_offset_id:
+        checkpoint["backfill_offset_id"] = oldest["message_id"]
@@ -6,7 +6,7 @@ Centralizes all configuration constants and settings for the application.
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 # Load environment variables
 load_dotenv()
@@ -56,6 +56,7 @@ class DataPathsConfig:
     MESSAGE_PATH: Path = BASE_DATA_PATH / "telegram_messages"
     IMAGE_PATH: Path = BASE_DATA_PATH / "images"
     DATA_LAKE_PATH: str = "data/raw/telegram_messages"
+    CHECKPOINT_PATH: Path = Path("data/state/checkpoints")
 
 
 # Channel Configuration
@@ -69,6 +70,39 @@ class ChannelConfig:
     ]
 
 
+# Scraper Configuration
+class ScraperConfig:
+    """Telegram scraper runtime configuration."""
+    
+    # Maximum number of channels scraped in parallel under one client
+    MAX_CONCURRENT_CHANNELS: int = int(os.getenv("SCRAPER_MAX_CONCURRENT_CHANNELS", "4"))
+    
+    # Messages fetched on the first run of a channel without a checkpoint
+    INITIAL_SCRAPE_LIMIT: int = int(os.getenv("SCRAPER_INITIAL_LIMIT", "1000"))
+    
+    # Backfill pages through history in chunks, checkpointing after each one
+    BACKFILL_CHUNK_SIZE: int = int(os.getenv("SCRAPER_BACKFILL_CHUNK_SIZE", "500"))
+    BACKFILL_MAX_CHUNKS: int = int(os.getenv("SCRAPER_BACKFILL_MAX_CHUNKS", "20"))
+    
+    # Photo downloads run on a worker pool fed by a bounded queue
+    MEDIA_DOWNLOAD_WORKERS: int = int(os.getenv("SCRAPER_MEDIA_DOWNLOAD_WORKERS", "4"))
+    MEDIA_QUEUE_SIZE: int = int(os.getenv("SCRAPER_MEDIA_QUEUE_SIZE", "100"))
+    
+    # Messages are streamed to JSONL part files in chunks while scraping
+    WRITER_FLUSH_EVERY: int = int(os.getenv("SCRAPER_WRITER_FLUSH_EVERY", "200"))
+    WRITER_ROTATE_BYTES: int = int(os.getenv("SCRAPER_WRITER_ROTATE_BYTES", str(64 * 1024 * 1024)))
+    WRITER_COMPRESSION: str = os.getenv("SCRAPER_WRITER_COMPRESSION", "none")  # none, gzip or zstd
+    
+    # Shared token bucket for Telegram calls, adapted to FloodWait hints
+    RATE_LIMIT_MAX_RATE: float = float(os.getenv("SCRAPER_RATE_LIMIT_MAX_RATE", "10"))
+    RATE_LIMIT_MIN_RATE: float = float(os.getenv("SCRAPER_RATE_LIMIT_MIN_RATE", "0.5"))
+    RATE_LIMIT_BURST: int = int(os.getenv("SCRAPER_RATE_LIMIT_BURST", "10"))
+    RATE_LIMIT_INCREASE: float = float(os.getenv("SCRAPER_RATE_LIMIT_INCREASE", "0.1"))
+    RATE_LIMIT_DECREASE_FACTOR: float = float(os.getenv("SCRAPER_RATE_LIMIT_DECREASE_FACTOR", "0.5"))
+    # Messages per history request (Telegram's maximum is 100)
+    RATE_LIMIT_PAGE_SIZE: int = int(os.getenv("SCRAPER_RATE_LIMIT_PAGE_SIZE", "100"))
+
+
 # Schema and Table Configuration
 class DatabaseSchemaConfig:
     """Database schema and table definitions."""
@@ -78,22 +112,415 @@ class DatabaseSchemaConfig:
     
     CREATE_SCHEMA_QUERY: str = f"CREATE SCHEMA IF NOT EXISTS {RAW_SCHEMA};"
     
+    # Telegram message ids are only unique within a channel. The table is
+    # range-partitioned by month on message_date, which therefore has to be
+    # part of the key; a message's date never changes, so the key still
+    # identifies one message per channel.
+    MESSAGE_KEY: str = "channel_name, message_id, message_date"
+    
     CREATE_TABLE_QUERY: str = f"""
     CREATE TABLE IF NOT EXISTS {RAW_SCHEMA}.{TELEGRAM_MESSAGES_TABLE} (
-        message_id BIGINT PRIMARY KEY,
-        channel_name TEXT,
-        message_date TIMESTAMP,
+        message_id BIGINT NOT NULL,
+        channel_name TEXT NOT NULL,
+        message_date TIMESTAMP NOT NULL,
         message_text TEXT,
         has_media BOOLEAN,
         image_path TEXT,
         views INT,
-        forwards INT
-    );
+        forwards INT,
+        first_seen_at TIMESTAMP NOT NULL DEFAULT now(),
+        last_seen_at TIMESTAMP NOT NULL DEFAULT now(),
+        PRIMARY KEY ({MESSAGE_KEY})
+    ) PARTITION BY RANGE (message_date);
+    """
+    
+    # Monthly partitions are created on demand, e.g. telegram_messages_y2024m01
+    PARTITION_NAME_FORMAT: str = f"{TELEGRAM_MESSAGES_TABLE}_y{{year:04d}}m{{month:02d}}"
+    
+    MISSING_PARTITIONS_QUERY: str = f"""
+    SELECT name FROM unnest(%s::text[]) AS name
+    WHERE to_regclass('{RAW_SCHEMA}.' || quote_ident(name)) IS NULL;
+    """
+    
+    CREATE_PARTITION_QUERY: str = f"""
+    CREATE TABLE IF NOT EXISTS {RAW_SCHEMA}.{{partition}}
+    PARTITION OF {RAW_SCHEMA}.{TELEGRAM_MESSAGES_TABLE}
+    FOR VALUES FROM (%s) TO (%s);
+    """
+    
+    # Serializes partition creation across concurrent loader sessions
+    PARTITION_LOCK_QUERY: str = "SELECT pg_advisory_xact_lock(hashtext('raw.telegram_messages partitions'));"
+    
+    # Tables created before partitioning are migrated once into the new layout
+    TABLE_KIND_QUERY: str = f"""
+    SELECT c.relkind
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = '{RAW_SCHEMA}' AND c.relname = '{TELEGRAM_MESSAGES_TABLE}';
+    """
+    
+    LEGACY_TABLE: str = f"{TELEGRAM_MESSAGES_TABLE}_unpartitioned"
+    
+    RENAME_LEGACY_TABLE_QUERY: str = f"""
+    ALTER TABLE {RAW_SCHEMA}.{TELEGRAM_MESSAGES_TABLE} RENAME TO {LEGACY_TABLE};
+    ALTER INDEX IF EXISTS {RAW_SCHEMA}.{TELEGRAM_MESSAGES_TABLE}_pkey RENAME TO {LEGACY_TABLE}_pkey;
+    """
+    
+    LEGACY_MONTHS_QUERY: str = f"""
+    SELECT DISTINCT to_char(message_date, 'YYYY-MM')
+    FROM {RAW_SCHEMA}.{LEGACY_TABLE}
+    WHERE message_date IS NOT NULL;
+    """
+    
+    # Rows the copy below can't migrate: channel_name and message_date are
+    # part of the new primary key, so they can't be NULL in any partition
+    LEGACY_UNMIGRATABLE_QUERY: str = f"""
+    SELECT
+        count(*),
+        count(*) FILTER (WHERE channel_name IS NULL OR message_date IS NULL)
+    FROM {RAW_SCHEMA}.{LEGACY_TABLE};
+    """
+    
+    COPY_LEGACY_TABLE_QUERY: str = f"""
+    INSERT INTO {RAW_SCHEMA}.{TELEGRAM_MESSAGES_TABLE}
+    (message_id, channel_name, message_date, message_text, has_media, image_path, views, forwards)
+    SELECT message_id, channel_name, message_date, message_text, has_media, image_path, views, forwards
+    FROM {RAW_SCHEMA}.{LEGACY_TABLE}
+    WHERE channel_name IS NOT NULL AND message_date IS NOT NULL
+    ON CONFLICT ({MESSAGE_KEY}) DO NOTHING;
     """
     
+    # Conflict handling: keep the first-seen row, or refresh engagement counts.
+    # The refresh only rewrites rows whose views/forwards actually changed,
+    # stamping last_seen_at with the time the new counts were observed.
+    ON_CONFLICT_IGNORE: str = f"ON CONFLICT ({MESSAGE_KEY}) DO NOTHING"
+    
+    ON_CONFLICT_REFRESH: str = f"""ON CONFLICT ({MESSAGE_KEY}) DO UPDATE SET
+        views = EXCLUDED.views,
+        forwards = EXCLUDED.forwards,
+        last_seen_at = now()
+    WHERE ({TELEGRAM_MESSAGES_TABLE}.views, {TELEGRAM_MESSAGES_TABLE}.forwards)
+        IS DISTINCT FROM (EXCLUDED.views, EXCLUDED.forwards)"""
+    
     INSERT_QUERY: str = f"""
     INSERT INTO {RAW_SCHEMA}.{TELEGRAM_MESSAGES_TABLE}
     (message_id, channel_name, message_date, message_text, has_media, image_path, views, forwards)
     VALUES %s
-    ON CONFLICT (message_id) DO NOTHING;
+    {ON_CONFLICT_IGNORE};
+    """
+    
+    UPSERT_QUERY: str = f"""
+    INSERT INTO {RAW_SCHEMA}.{TELEGRAM_MESSAGES_TABLE}
+    (message_id, channel_name, message_date, message_text, has_media, image_path, views, forwards)
+    VALUES %s
+    {ON_CONFLICT_REFRESH};
     """
+    
+    # Bulk loading stages rows with COPY into a session-local staging table
+    # (temporary tables are never WAL-logged) and merges them in one statement.
+    STAGING_TABLE: str = f"{TELEGRAM_MESSAGES_TABLE}_staging"
+    
+    CREATE_STAGING_TABLE_QUERY: str = f"""
+    CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE}
+    (LIKE {RAW_SCHEMA}.{TELEGRAM_MESSAGES_TABLE} INCLUDING DEFAULTS);
+    """
+    
+    COPY_STAGING_QUERY: str = f"""
+    COPY {STAGING_TABLE}
+    (message_id, channel_name, message_date, message_text, has_media, image_path, views, forwards)
+    FROM STDIN;
+    """
+    
+    # Formatted with ON_CONFLICT_IGNORE or ON_CONFLICT_REFRESH; returns the
+    # number of inserted and updated rows
+    # System columns such as xmax can't be returned from a partitioned table,
+    # so merged rows are told apart by looking them up in the target: the
+    # outer SELECT sees the table as it was before the INSERT ran.
+    MERGE_STAGING_QUERY: str = f"""
+    WITH merged AS (
+        INSERT INTO {RAW_SCHEMA}.{TELEGRAM_MESSAGES_TABLE}
+        (message_id, channel_name, message_date, message_text, has_media, image_path, views, forwards)
+        SELECT DISTINCT ON ({MESSAGE_KEY})
+            message_id, channel_name, message_date, message_text, has_media, image_path, views, forwards
+        FROM {STAGING_TABLE}
+        ORDER BY {MESSAGE_KEY}
+        {{on_conflict}}
+        RETURNING {MESSAGE_KEY}
+    )
+    SELECT
+        count(*) FILTER (WHERE existing.message_id IS NULL),
+        count(*) FILTER (WHERE existing.message_id IS NOT NULL)
+    FROM merged
+    LEFT JOIN {RAW_SCHEMA}.{TELEGRAM_MESSAGES_TABLE} AS existing
+        USING ({MESSAGE_KEY});
+    """
+    
+    TRUNCATE_STAGING_QUERY: str = f"TRUNCATE {STAGING_TABLE};"
+    
+    # YOLO enrichment results, one row per image
+    YOLO_DETECTIONS_TABLE: str = "yolo_detections"
+    YOLO_STAGING_TABLE: str = f"{YOLO_DETECTIONS_TABLE}_staging"
+    
+    CREATE_YOLO_TABLE_QUERY: str = f"""
+    CREATE TABLE IF NOT EXISTS {RAW_SCHEMA}.{YOLO_DETECTIONS_TABLE} (
+        image_name TEXT PRIMARY KEY,
+        detected_objects TEXT,
+        image_category TEXT,
+        confidence_score NUMERIC
+    );
+    CREATE INDEX IF NOT EXISTS {YOLO_DETECTIONS_TABLE}_image_category_idx
+        ON {RAW_SCHEMA}.{YOLO_DETECTIONS_TABLE} (image_category);
+    """
+    
+    CREATE_YOLO_STAGING_TABLE_QUERY: str = f"""
+    CREATE TEMP TABLE IF NOT EXISTS {YOLO_STAGING_TABLE}
+    (LIKE {RAW_SCHEMA}.{YOLO_DETECTIONS_TABLE});
+    TRUNCATE {YOLO_STAGING_TABLE};
+    """
+    
+    # The CSV is streamed as-is; its header must match this column order
+    COPY_YOLO_STAGING_QUERY: str = f"""
+    COPY {YOLO_STAGING_TABLE}
+    (image_name, detected_objects, image_category, confidence_score)
+    FROM STDIN WITH (FORMAT csv, HEADER true);
+    """
+    
+    # Returns the number of inserted and updated rows
+    MERGE_YOLO_STAGING_QUERY: str = f"""
+    WITH merged AS (
+        INSERT INTO {RAW_SCHEMA}.{YOLO_DETECTIONS_TABLE}
+        (image_name, detected_objects, image_category, confidence_score)
+        SELECT DISTINCT ON (image_name)
+            image_name, detected_objects, image_category, confidence_score
+        FROM {YOLO_STAGING_TABLE}
+        WHERE image_name IS NOT NULL
+        ORDER BY image_name
+        ON CONFLICT (image_name) DO UPDATE SET
+            detected_objects = EXCLUDED.detected_objects,
+            image_category = EXCLUDED.image_category,
+            confidence_score = EXCLUDED.confidence_score
+        WHERE ({YOLO_DETECTIONS_TABLE}.detected_objects, {YOLO_DETECTIONS_TABLE}.image_category,
+               {YOLO_DETECTIONS_TABLE}.confidence_score)
+            IS DISTINCT FROM
+              (EXCLUDED.detected_objects, EXCLUDED.image_category, EXCLUDED.confidence_score)
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT
+        count(*) FILTER (WHERE inserted),
+        count(*) FILTER (WHERE NOT inserted)
+    FROM merged;
+    """
+    
+    # Per-box YOLO output: one row per processed image and one per detected box.
+    # Images are keyed by channel and file name, since message ids repeat across channels.
+    YOLO_IMAGES_TABLE: str = "yolo_images"
+    YOLO_BOXES_TABLE: str = "yolo_boxes"
+    YOLO_IMAGES_STAGING_TABLE: str = f"{YOLO_IMAGES_TABLE}_staging"
+    YOLO_BOXES_STAGING_TABLE: str = f"{YOLO_BOXES_TABLE}_staging"
+    
+    CREATE_YOLO_BOXES_TABLES_QUERY: str = f"""
+    CREATE TABLE IF NOT EXISTS {RAW_SCHEMA}.{YOLO_IMAGES_TABLE} (
+        channel_name TEXT NOT NULL,
+        image_name TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        model_key TEXT NOT NULL,
+        box_count INTEGER NOT NULL,
+        detected_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        PRIMARY KEY (channel_name, image_name)
+    );
+    CREATE TABLE IF NOT EXISTS {RAW_SCHEMA}.{YOLO_BOXES_TABLE} (
+        channel_name TEXT NOT NULL,
+        image_name TEXT NOT NULL,
+        box_index SMALLINT NOT NULL,
+        class_id SMALLINT NOT NULL,
+        class_name TEXT NOT NULL,
+        confidence REAL NOT NULL,
+        x1 REAL NOT NULL,
+        y1 REAL NOT NULL,
+        x2 REAL NOT NULL,
+        y2 REAL NOT NULL,
+        PRIMARY KEY (channel_name, image_name, box_index)
+    );
+    CREATE INDEX IF NOT EXISTS {YOLO_BOXES_TABLE}_class_name_idx
+        ON {RAW_SCHEMA}.{YOLO_BOXES_TABLE} (class_name);
+    """
+    
+    CREATE_YOLO_BOXES_STAGING_QUERY: str = f"""
+    CREATE TEMP TABLE IF NOT EXISTS {YOLO_IMAGES_STAGING_TABLE}
+    (LIKE {RAW_SCHEMA}.{YOLO_IMAGES_TABLE} INCLUDING DEFAULTS);
+    CREATE TEMP TABLE IF NOT EXISTS {YOLO_BOXES_STAGING_TABLE}
+    (LIKE {RAW_SCHEMA}.{YOLO_BOXES_TABLE});
+    TRUNCATE {YOLO_IMAGES_STAGING_TABLE}, {YOLO_BOXES_STAGING_TABLE};
+    """
+    
+    COPY_YOLO_IMAGES_STAGING_QUERY: str = f"""
+    COPY {YOLO_IMAGES_STAGING_TABLE}
+    (channel_name, image_name, content_hash, model_key, box_count)
+    FROM STDIN WITH (FORMAT csv);
+    """
+    
+    COPY_YOLO_BOXES_STAGING_QUERY: str = f"""
+    COPY {YOLO_BOXES_STAGING_TABLE}
+    (channel_name, image_name, box_index, class_id, class_name, confidence, x1, y1, x2, y2)
+    FROM STDIN WITH (FORMAT csv);
+    """
+    
+    # Re-detected images replace all of their previous boxes
+    MERGE_YOLO_BOXES_QUERY: str = f"""
+    DELETE FROM {RAW_SCHEMA}.{YOLO_BOXES_TABLE} b
+    USING {YOLO_IMAGES_STAGING_TABLE} s
+    WHERE b.channel_name = s.channel_name AND b.image_name = s.image_name;
+    
+    INSERT INTO {RAW_SCHEMA}.{YOLO_BOXES_TABLE}
+    SELECT * FROM {YOLO_BOXES_STAGING_TABLE};
+    
+    INSERT INTO {RAW_SCHEMA}.{YOLO_IMAGES_TABLE}
+    (channel_name, image_name, content_hash, model_key, box_count, detected_at)
+    SELECT channel_name, image_name, content_hash, model_key, box_count, detected_at
+    FROM {YOLO_IMAGES_STAGING_TABLE}
+    ON CONFLICT (channel_name, image_name) DO UPDATE SET
+        content_hash = EXCLUDED.content_hash,
+        model_key = EXCLUDED.model_key,
+        box_count = EXCLUDED.box_count,
+        detected_at = EXCLUDED.detected_at;
+    
+    TRUNCATE {YOLO_IMAGES_STAGING_TABLE}, {YOLO_BOXES_STAGING_TABLE};
+    """
+    
+    # Images already detected with a model, used to skip unchanged images
+    SELECT_YOLO_IMAGES_QUERY: str = f"""
+    SELECT channel_name, image_name, content_hash
+    FROM {RAW_SCHEMA}.{YOLO_IMAGES_TABLE}
+    WHERE model_key = %s;
+    """
+    
+    # Warehouse version marker: a single-row counter bumped after every
+    # successful dbt run, so API caches know when served data changed
+    WAREHOUSE_VERSION_TABLE: str = "warehouse_version"
+    
+    CREATE_WAREHOUSE_VERSION_TABLE_QUERY: str = f"""
+    CREATE TABLE IF NOT EXISTS {RAW_SCHEMA}.{WAREHOUSE_VERSION_TABLE} (
+        id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+        version BIGINT NOT NULL,
+        refreshed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+    """
+    
+    BUMP_WAREHOUSE_VERSION_QUERY: str = f"""
+    INSERT INTO {RAW_SCHEMA}.{WAREHOUSE_VERSION_TABLE} (id, version)
+    VALUES (1, 1)
+    ON CONFLICT (id) DO UPDATE SET
+        version = {WAREHOUSE_VERSION_TABLE}.version + 1,
+        refreshed_at = now()
+    RETURNING version;
+    """
+    
+    # Manifest of data lake files already loaded, so unchanged files are skipped
+    LOAD_MANIFEST_TABLE: str = "load_manifest"
+    
+    CREATE_MANIFEST_TABLE_QUERY: str = f"""
+    CREATE TABLE IF NOT EXISTS {RAW_SCHEMA}.{LOAD_MANIFEST_TABLE} (
+        file_path TEXT PRIMARY KEY,
+        file_size BIGINT NOT NULL,
+        file_mtime DOUBLE PRECISION NOT NULL,
+        content_hash TEXT NOT NULL,
+        row_count INT,
+        loaded_at TIMESTAMP NOT NULL DEFAULT now()
+    );
+    """
+    
+    SELECT_MANIFEST_QUERY: str = f"""
+    SELECT file_path, file_size, file_mtime, content_hash
+    FROM {RAW_SCHEMA}.{LOAD_MANIFEST_TABLE};
+    """
+    
+    UPSERT_MANIFEST_QUERY: str = f"""
+    INSERT INTO {RAW_SCHEMA}.{LOAD_MANIFEST_TABLE}
+    (file_path, file_size, file_mtime, content_hash, row_count, loaded_at)
+    VALUES (%s, %s, %s, %s, %s, now())
+    ON CONFLICT (file_path) DO UPDATE SET
+        file_size = EXCLUDED.file_size,
+        file_mtime = EXCLUDED.file_mtime,
+        content_hash = EXCLUDED.content_hash,
+        row_count = COALESCE(EXCLUDED.row_count, {LOAD_MANIFEST_TABLE}.row_count),
+        loaded_at = CASE
+            WHEN EXCLUDED.row_count IS NULL THEN {LOAD_MANIFEST_TABLE}.loaded_at
+            ELSE now()
+        END;
+    """
+
+
+# Raw Loader Configuration
+class LoaderConfig:
+    """Raw data loader configuration."""
+    
+    # Rows staged through COPY before each set-based merge in bulk mode
+    BULK_BATCH_SIZE: int = int(os.getenv("LOADER_BULK_BATCH_SIZE", "50000"))
+    
+    # Refresh views/forwards of messages already loaded instead of ignoring them
+    REFRESH_ENGAGEMENT: bool = os.getenv("LOADER_REFRESH_ENGAGEMENT", "true").lower() == "true"
+    
+    # Messages parsed and inserted per chunk, bounding memory per file
+    PARSE_CHUNK_SIZE: int = int(os.getenv("LOADER_PARSE_CHUNK_SIZE", "5000"))
+    
+    # Parallel ingestion: parser processes and pooled database connections.
+    # PARSE_WORKERS of 0 keeps the serial single-connection load.
+    PARSE_WORKERS: int = int(os.getenv("LOADER_PARSE_WORKERS", "0"))
+    DB_WORKERS: int = int(os.getenv("LOADER_DB_WORKERS", "4"))
+    
+    # Directory for the temporary files parsed rows are passed through during
+    # parallel ingestion (system temp directory when unset)
+    SPILL_DIR: Optional[str] = os.getenv("LOADER_SPILL_DIR") or None
+
+
+# YOLO Enrichment Configuration
+class YoloConfig:
+    """YOLO object detection configuration."""
+    
+    # Images per inference call; 1 keeps the original one-image-per-call loop
+    BATCH_SIZE: int = int(os.getenv("YOLO_BATCH_SIZE", "16"))
+    
+    # Threads decoding and letterboxing upcoming images while a batch runs
+    PREFETCH_WORKERS: int = int(os.getenv("YOLO_PREFETCH_WORKERS", "4"))
+    
+    # Letterboxed images held back waiting for a full batch of their shape,
+    # across all shapes; at the cap the fullest shape is sent as a short batch
+    # (0 = 4 batches)
+    MAX_BUFFERED_IMAGES: int = int(os.getenv("YOLO_MAX_BUFFERED_IMAGES", "0"))
+    
+    # Inference input size in pixels (the model's default)
+    IMAGE_SIZE: int = int(os.getenv("YOLO_IMAGE_SIZE", "640"))
+    
+    # Detection cache keyed by image content hash and model, so only new or
+    # changed images are run through inference
+    USE_CACHE: bool = os.getenv("YOLO_USE_CACHE", "true").lower() == "true"
+    CACHE_PATH: Path = Path(os.getenv("YOLO_CACHE_PATH", "data/state/yolo_detections.sqlite"))
+    
+    # Inference worker processes, each loading the model once; 1 runs in-process.
+    # THREADS_PER_WORKER caps torch intra-op threads per worker (0 = CPU cores
+    # divided by WORKERS) so workers don't oversubscribe the machine.
+    WORKERS: int = int(os.getenv("YOLO_WORKERS", "1"))
+    THREADS_PER_WORKER: int = int(os.getenv("YOLO_THREADS_PER_WORKER", "0"))
+    
+    # Images handed to a worker per task; results stream back per task
+    SHARD_SIZE: int = int(os.getenv("YOLO_SHARD_SIZE", "64"))
+    
+    # Fast categorization: detect only the classes classify_image uses at a
+    # reduced input size, and re-run images with no detections or a detection
+    # below FAST_ESCALATE_CONFIDENCE through the full pass
+    FAST_MODE: bool = os.getenv("YOLO_FAST_MODE", "false").lower() == "true"
+    FAST_IMAGE_SIZE: int = int(os.getenv("YOLO_FAST_IMAGE_SIZE", "320"))
+    FAST_ESCALATE_CONFIDENCE: float = float(os.getenv("YOLO_FAST_ESCALATE_CONFIDENCE", "0.5"))
+    FAST_ESCALATE_EMPTY: bool = os.getenv("YOLO_FAST_ESCALATE_EMPTY", "true").lower() == "true"
+    
+    # Where detections go: "csv" writes the image-level CSV, "postgres" streams
+    # per-box rows into raw.yolo_images / raw.yolo_boxes
+    OUTPUT: str = os.getenv("YOLO_OUTPUT", "csv")
+    
+    # Boxes buffered before each COPY + merge in postgres output mode
+    BOX_BATCH_SIZE: int = int(os.getenv("YOLO_BOX_BATCH_SIZE", "5000"))
+    
+    # Group near-duplicate images (reposts) by perceptual hash and run
+    # detection once per group; hashes within DEDUP_MAX_DISTANCE bits match
+    DEDUP: bool = os.getenv("YOLO_DEDUP", "false").lower() == "true"
+    DEDUP_MAX_DISTANCE: int = int(os.getenv("YOLO_DEDUP_MAX_DISTANCE", "4"))
@@ -0,0 +1,165 @@
+"""
+Persistent YOLO detection cache for incremental image enrichment.
+
+Detections are stored in a local SQLite database keyed by the SHA-256 of the
+image contents and the model they were produced with, so a run only has to
+infer images it has never seen (or that changed on disk). File hashes are
+remembered by path, size and mtime so unchanged images are not re-read.
+"""
+import os
+import sqlite3
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+
+CREATE_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS image_hashes (
+    image_path TEXT PRIMARY KEY,
+    file_size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS detections (
+    content_hash TEXT NOT NULL,
+    model_key TEXT NOT NULL,
+    detected_objects TEXT NOT NULL,
+    image_category TEXT NOT NULL,
+    confidence_score REAL NOT NULL,
+    PRIMARY KEY (content_hash, model_key)
+);
+"""
+
+# SQLite caps the number of bound parameters per statement
+LOOKUP_CHUNK_SIZE = 500
+
+
+def hash_image(image_path: Path) -> str:
+    """
+    Compute the SHA-256 of an image's contents.
+
+    Args:
+        image_path: Path to the image.
+
+    Returns:
+        Hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(image_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DetectionCache:
+    """
+    SQLite-backed cache of image-level detection results.
+
+    Results are stored without the image name, since identical content can
+    appear under several names; callers attach the name when building output.
+    """
+
+    def __init__(self, db_path: Path, model_key: str):
+        """
+        Args:
+            db_path: SQLite database file, created if missing.
+            model_key: Identifies the model and settings results came from.
+        """
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.model_key = model_key
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.executescript(CREATE_TABLES_SQL)
+        self.hashed = 0
+        self.hash_reused = 0
+
+    def __enter__(self) -> "DetectionCache":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Commit pending writes and close the database."""
+        self.conn.commit()
+        self.conn.close()
+
+    def content_hashes(self, image_paths: Iterable[Path]) -> Dict[Path, str]:
+        """
+        Get content hashes, re-reading only files whose size or mtime changed.
+
+        Args:
+            image_paths: Images to hash.
+
+        Returns:
+            Mapping of image path to content hash.
+        """
+        known = {
+            row[0]: (row[1], row[2], row[3])
+            for row in self.conn.execute(
+                "SELECT image_path, file_size, mtime_ns, content_hash FROM image_hashes"
+            )
+        }
+
+        hashes = {}
+        updates = []
+        for image_path in image_paths:
+            stat = os.stat(image_path)
+            key = str(image_path)
+            entry = known.get(key)
+            if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                hashes[image_path] = entry[2]
+                self.hash_reused += 1
+                continue
+
+            content_hash = hash_image(image_path)
+            hashes[image_path] = content_hash
+            updates.append((key, stat.st_size, stat.st_mtime_ns, content_hash))
+            self.hashed += 1
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO image_hashes VALUES (?, ?, ?, ?)", updates
+        )
+        self.conn.commit()
+        return hashes
+
+    def lookup(self, content_hashes: Iterable[str]) -> Dict[str, Tuple[str, str, float]]:
+        """
+        Fetch cached results for the current model.
+
+        Args:
+            content_hashes: Hashes to look up.
+
+        Returns:
+            Mapping of content hash to (detected_objects, image_category,
+            confidence_score) for the hashes that are cached.
+        """
+        content_hashes = list(set(content_hashes))
+        cached = {}
+        for start in range(0, len(content_hashes), LOOKUP_CHUNK_SIZE):
+            chunk = content_hashes[start:start + LOOKUP_CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"""
+                SELECT content_hash, detected_objects, image_category, confidence_score
+                FROM detections
+                WHERE model_key = ? AND content_hash IN ({placeholders})
+                """,
+                [self.model_key, *chunk]
+            )
+            for content_hash, detected_objects, image_category, confidence_score in rows:
+                cached[content_hash] = (detected_objects, image_category, confidence_score)
+        return cached
+
+    def store(self, results: List[Tuple[str, str, str, float]]) -> None:
+        """
+        Save results for the current model.
+
+        Args:
+            results: (content_hash, detected_objects, image_category,
+                confidence_score) tuples.
+        """
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO detections VALUES (?, ?, ?, ?, ?)",
+            [(content_hash, self.model_key, *result) for content_hash, *result in results]
+        )
+        self.conn.commit()
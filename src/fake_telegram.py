@@ -0,0 +1,181 @@
+"""
+Offline stand-in for TelegramClient.
+
+Serves synthetic channels from memory so the scraper can be exercised and
+benchmarked without a Telegram session. Messages carry real Telethon media
+types, API calls can be given artificial latency, and FloodWait errors can be
+injected every N requests to exercise the rate limiter.
+"""
+import random
+import asyncio
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Optional, AsyncIterator
+
+from telethon.errors import FloodWaitError
+from telethon.tl.types import MessageMediaPhoto, MessageMediaDocument, Photo, PhotoSize
+
+
+# Telegram returns at most this many messages per history request
+PAGE_SIZE = 100
+
+
+class FakeMessage:
+    """Minimal message object exposing the attributes the scraper reads."""
+
+    def __init__(self, message_id: int, date: datetime, text: str, views: int, forwards: int, media):
+        self.id = message_id
+        self.date = date
+        self.text = text
+        self.message = text
+        self.views = views
+        self.forwards = forwards
+        self.media = media
+
+
+class FakeTelegramClient:
+    """
+    In-process TelegramClient replacement serving synthetic channels.
+
+    Message ids run from 1 (oldest) to the channel size (newest), and
+    iter_messages honours limit, min_id, offset_id and reverse the way
+    Telethon does.
+    """
+
+    def __init__(
+        self,
+        channels: Dict[str, int],
+        media_ratio: float = 0.3,
+        photo_bytes: int = 50_000,
+        request_latency: float = 0.0,
+        download_latency: float = 0.0,
+        flood_wait_every: int = 0,
+        flood_wait_seconds: int = 1,
+        seed: int = 42
+    ):
+        """
+        Args:
+            channels: Mapping of channel name to number of messages.
+            media_ratio: Fraction of messages carrying a photo.
+            photo_bytes: Size of each downloaded photo.
+            request_latency: Seconds added to every history page request.
+            download_latency: Seconds added to every media download.
+            flood_wait_every: Raise a FloodWait on every Nth API call (0 disables).
+            flood_wait_seconds: Wait time carried by injected FloodWait errors.
+            seed: Random seed, so runs are reproducible.
+        """
+        self.channels = channels
+        self.media_ratio = media_ratio
+        self.photo_bytes = photo_bytes
+        self.request_latency = request_latency
+        self.download_latency = download_latency
+        self.flood_wait_every = flood_wait_every
+        self.flood_wait_seconds = flood_wait_seconds
+        self.seed = seed
+        self.flood_sleep_threshold = 60
+
+        self.requests = 0
+        self.downloads = 0
+        self.flood_waits = 0
+        self._start_date = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    async def __aenter__(self) -> "FakeTelegramClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
+
+    def _make_message(self, channel_name: str, message_id: int) -> FakeMessage:
+        rng = random.Random(f"{self.seed}:{channel_name}:{message_id}")
+        media = None
+        roll = rng.random()
+        if roll < self.media_ratio:
+            photo = Photo(
+                id=message_id,
+                access_hash=rng.getrandbits(63),
+                file_reference=b"",
+                date=self._start_date,
+                sizes=[PhotoSize(type="y", w=1280, h=1280, size=self.photo_bytes)],
+                dc_id=2
+            )
+            media = MessageMediaPhoto(photo=photo)
+        elif roll < self.media_ratio + 0.05:
+            media = MessageMediaDocument()
+
+        words = rng.choices(
+            ["paracetamol", "vitamin", "serum", "cream", "price", "birr", "available", "delivery"],
+            k=rng.randint(3, 40)
+        )
+        return FakeMessage(
+            message_id=message_id,
+            date=self._start_date + timedelta(minutes=10 * message_id),
+            text=" ".join(words),
+            views=rng.randint(0, 20_000),
+            forwards=rng.randint(0, 200),
+            media=media
+        )
+
+    async def _api_call(self, latency: float) -> None:
+        self.requests += 1
+        if latency:
+            await asyncio.sleep(latency)
+        if self.flood_wait_every and self.requests % self.flood_wait_every == 0:
+            self.flood_waits += 1
+            raise FloodWaitError(request=None, capture=self.flood_wait_seconds)
+
+    async def iter_messages(
+        self,
+        entity: str,
+        limit: Optional[int] = None,
+        min_id: int = 0,
+        offset_id: int = 0,
+        reverse: bool = False,
+        **kwargs
+    ) -> AsyncIterator[FakeMessage]:
+        """
+        Yield synthetic messages of a channel, one simulated API page at a time.
+
+        Args:
+            entity: Channel name.
+            limit: Maximum number of messages, or None for all.
+            min_id: Only return messages with a greater id.
+            offset_id: Exclusive starting id (older than it, or newer if reverse).
+            reverse: Return messages oldest first.
+
+        Yields:
+            FakeMessage objects.
+        """
+        if entity not in self.channels:
+            raise ValueError(f"No channel named {entity}")
+
+        size = self.channels[entity]
+        if reverse:
+            ids = range(max(min_id, offset_id) + 1, size + 1)
+        else:
+            newest = offset_id - 1 if offset_id else size
+            ids = range(newest, min_id, -1)
+        if limit is not None:
+            ids = ids[:limit]
+
+        for position, message_id in enumerate(ids):
+            if position % PAGE_SIZE == 0:
+                await self._api_call(self.request_latency)
+            yield self._make_message(entity, message_id)
+
+    async def download_media(self, media, file) -> str:
+        """
+        Write a photo of the size Telegram would report to the target path.
+
+        Args:
+            media: MessageMediaPhoto created by this client.
+            file: Target path.
+
+        Returns:
+            Path of the written file.
+        """
+        await self._api_call(self.download_latency)
+        size = max(photo_size.size for photo_size in media.photo.sizes)
+        path = Path(file)
+        path.write_bytes(b"\xff" * size)
+        self.downloads += 1
+        return str(path)
@@ -0,0 +1,215 @@
+"""
+Perceptual-hash deduplication of reposted images.
+
+Pharmacy channels repost the same promo pictures across channels and days,
+often re-encoded or resized, so byte hashes don't match. Each image gets a
+64-bit DCT perceptual hash (pHash), stored in SQLite by path, size and mtime
+so only new images are decoded. Images within a small Hamming distance of a
+group's representative join its group, and detection runs once per group.
+"""
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS perceptual_hashes (
+    image_path TEXT PRIMARY KEY,
+    file_size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    phash TEXT
+);
+"""
+
+HASH_BITS = 64
+
+
+def compute_phash(image_path: Path) -> Optional[int]:
+    """
+    Compute the 64-bit DCT perceptual hash of an image.
+
+    The image is reduced to 32x32 grayscale, transformed with a DCT, and the
+    8x8 lowest frequencies are compared against their median (DC excluded).
+
+    Args:
+        image_path: Path to the image.
+
+    Returns:
+        Hash as an integer, or None if the image can't be decoded.
+    """
+    # imdecode instead of imread so non-ASCII paths work on every platform
+    data = np.fromfile(str(image_path), dtype=np.uint8)
+    image = cv2.imdecode(data, cv2.IMREAD_GRAYSCALE) if data.size else None
+    if image is None:
+        return None
+
+    small = cv2.resize(image, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].flatten()
+    bits = low > np.median(low[1:])
+
+    phash = 0
+    for bit in bits:
+        phash = (phash << 1) | int(bit)
+    return phash
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return bin(a ^ b).count("1")
+
+
+class PerceptualHashIndex:
+    """
+    SQLite-backed store of perceptual hashes for the image data lake.
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Args:
+            db_path: SQLite database file, created if missing.
+        """
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.executescript(CREATE_TABLE_SQL)
+        self.computed = 0
+        self.reused = 0
+
+    def __enter__(self) -> "PerceptualHashIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+    def hashes(self, image_paths: List[Path], workers: int = 4) -> Dict[Path, Optional[int]]:
+        """
+        Get perceptual hashes, decoding only files whose size or mtime changed.
+
+        Args:
+            image_paths: Images to hash.
+            workers: Threads decoding new images.
+
+        Returns:
+            Mapping of image path to hash (None for undecodable images).
+        """
+        known = {
+            row[0]: (row[1], row[2], row[3])
+            for row in self.conn.execute(
+                "SELECT image_path, file_size, mtime_ns, phash FROM perceptual_hashes"
+            )
+        }
+
+        hashes = {}
+        stale = []
+        for image_path in image_paths:
+            stat = os.stat(image_path)
+            entry = known.get(str(image_path))
+            if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                hashes[image_path] = int(entry[2], 16) if entry[2] else None
+                self.reused += 1
+            else:
+                stale.append((image_path, stat))
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            computed = executor.map(compute_phash, [image_path for image_path, _ in stale])
+            updates = []
+            for (image_path, stat), phash in zip(stale, computed):
+                hashes[image_path] = phash
+                updates.append((
+                    str(image_path),
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    None if phash is None else f"{phash:016x}"
+                ))
+                self.computed += 1
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO perceptual_hashes VALUES (?, ?, ?, ?)", updates
+        )
+        self.conn.commit()
+        return hashes
+
+
+def group_near_duplicates(hashes: Dict[Path, Optional[int]], max_distance: int) -> Dict[Path, Path]:
+    """
+    Group images whose perceptual hashes are within max_distance bits.
+
+    Images are taken in input order. Each joins the earliest group whose
+    representative is within max_distance bits of it, or else starts a new
+    group as its representative. Matching against the representative only,
+    rather than any member, keeps chains of small differences from merging
+    images that look nothing alike.
+
+    Candidates are found by splitting each hash into max_distance + 1 bands:
+    two hashes within max_distance bits must agree exactly on at least one
+    band, so only representatives sharing a band are compared.
+
+    Args:
+        hashes: Mapping of image path to perceptual hash (None never groups).
+        max_distance: Largest Hamming distance counted as a duplicate.
+
+    Returns:
+        Mapping of every image path to its group's representative, the
+        group member that comes first in the input order.
+    """
+    bands = max_distance + 1
+    band_bits = -(-HASH_BITS // bands)
+    band_mask = (1 << band_bits) - 1
+
+    groups = {}
+    # Band value -> representatives, in the order they were found
+    buckets: Dict[tuple, List[Path]] = {}
+    order: Dict[Path, int] = {}
+
+    for image_path, phash in hashes.items():
+        if phash is None:
+            groups[image_path] = image_path
+            continue
+
+        keys = [(band, (phash >> (band * band_bits)) & band_mask) for band in range(bands)]
+        candidates = {rep for key in keys for rep in buckets.get(key, ())}
+        matches = [
+            rep for rep in candidates
+            if hamming_distance(phash, hashes[rep]) <= max_distance
+        ]
+
+        if matches:
+            groups[image_path] = min(matches, key=order.__getitem__)
+        else:
+            groups[image_path] = image_path
+            order[image_path] = len(order)
+            for key in keys:
+                buckets.setdefault(key, []).append(image_path)
+
+    return groups
+
+
+def dedup_stats(groups: Dict[Path, Path]) -> Dict[str, float]:
+    """
+    Summarize how much inference and storage grouping saves.
+
+    Args:
+        groups: Mapping of image path to representative path.
+
+    Returns:
+        Dictionary of image, group and duplicate counts, the share of
+        inference calls saved and the bytes held by duplicate copies.
+    """
+    images = len(groups)
+    representatives = set(groups.values())
+    duplicates = [image_path for image_path, rep in groups.items() if image_path != rep]
+    groups_with_duplicates = {groups[image_path] for image_path in duplicates}
+
+    return {
+        "images": images,
+        "groups": len(representatives),
+        "groups_with_duplicates": len(groups_with_duplicates),
+        "duplicates": len(duplicates),
+        "inference_saved": round(len(duplicates) / images, 4) if images else 0.0,
+        "duplicate_bytes": sum(os.path.getsize(image_path) for image_path in duplicates),
+    }
@@ -4,10 +4,16 @@ Module for loading raw JSON data from the data lake into PostgreSQL.
 This module reads JSON files from the data lake directory structure and loads
 them into the raw schema of the PostgreSQL database.
 """
+import io
 import os
-import json
+import pickle
+import hashlib
+import tempfile
+import time
 import logging
-from typing import List, Tuple, Optional
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Tuple, Dict, Iterable, Iterator, Optional
 import psycopg2
 from psycopg2.extras import execute_values
 from psycopg2 import sql
@@ -16,8 +22,10 @@ from psycopg2.pool import ThreadedConnectionPool
 from config import (
     DatabaseConfig,
     DatabaseSchemaConfig,
-    DataPathsConfig
+    DataPathsConfig,
+    LoaderConfig
 )
+from message_files import is_message_file, iter_message_chunks
 
 # Configure logging
 logging.basicConfig(
@@ -57,7 +65,7 @@ def get_database_connection():
 
 def create_schema_and_table(cursor) -> None:
     """
-    Create the raw schema and telegram_messages table if they don't exist.
+    Create the raw schema, telegram_messages and load_manifest tables if they don't exist.
     
     Args:
         cursor: Database cursor object.
@@ -68,19 +76,228 @@ def create_schema_and_table(cursor) -> None:
     try:
         logger.info("Creating raw schema and telegram_messages table if not exists")
         cursor.execute(DatabaseSchemaConfig.CREATE_SCHEMA_QUERY)
-        cursor.execute(DatabaseSchemaConfig.CREATE_TABLE_QUERY)
+        
+        # Tables created before partitioning ("r") are migrated once
+        cursor.execute(DatabaseSchemaConfig.TABLE_KIND_QUERY)
+        table_kind = cursor.fetchone()
+        if table_kind is None:
+            cursor.execute(DatabaseSchemaConfig.CREATE_TABLE_QUERY)
+        elif table_kind[0] == "r":
+            migrate_unpartitioned_table(cursor)
+        
+        cursor.execute(DatabaseSchemaConfig.CREATE_MANIFEST_TABLE_QUERY)
         logger.info("Schema and table creation completed successfully")
     except psycopg2.Error as e:
         logger.error(f"Failed to create schema/table: {e}")
         raise
 
 
-def parse_message_data(messages: List[dict]) -> List[Tuple]:
+def migrate_unpartitioned_table(cursor) -> None:
+    """
+    Move a telegram_messages table created before partitioning into the new layout.
+    
+    The old table, keyed on message_id alone, is renamed to
+    telegram_messages_unpartitioned and its rows are copied into the
+    partitioned table. The old table is kept so it can be checked and
+    dropped by hand. Rows without a channel_name or message_date can't be
+    keyed in the new table; they are counted and left in the old table.
+    
+    Args:
+        cursor: Database cursor object.
+    """
+    legacy_table = f"{DatabaseSchemaConfig.RAW_SCHEMA}.{DatabaseSchemaConfig.LEGACY_TABLE}"
+    logger.info(f"Migrating unpartitioned telegram_messages table; old rows are kept in {legacy_table}")
+    
+    cursor.execute(DatabaseSchemaConfig.RENAME_LEGACY_TABLE_QUERY)
+    cursor.execute(DatabaseSchemaConfig.CREATE_TABLE_QUERY)
+    
+    cursor.execute(DatabaseSchemaConfig.LEGACY_MONTHS_QUERY)
+    ensure_partitions(cursor, {month for (month,) in cursor.fetchall()})
+    
+    cursor.execute(DatabaseSchemaConfig.LEGACY_UNMIGRATABLE_QUERY)
+    total_rows, unkeyed_rows = cursor.fetchone()
+    
+    cursor.execute(DatabaseSchemaConfig.COPY_LEGACY_TABLE_QUERY)
+    copied_rows = cursor.rowcount
+    logger.info(f"Copied {copied_rows} of {total_rows} messages into the partitioned table")
+    
+    if unkeyed_rows:
+        logger.warning(
+            f"{unkeyed_rows} messages without channel_name or message_date were not "
+            f"migrated; they remain in {legacy_table}"
+        )
+
+
+def ensure_partitions(cursor, months: Iterable[str]) -> None:
+    """
+    Create the monthly partitions of raw.telegram_messages that are missing.
+    
+    Args:
+        cursor: Database cursor object.
+        months: Months as "YYYY-MM" strings.
+    """
+    partitions = {}
+    for month in months:
+        year, month_number = int(month[:4]), int(month[5:7])
+        name = DatabaseSchemaConfig.PARTITION_NAME_FORMAT.format(year=year, month=month_number)
+        start = f"{year:04d}-{month_number:02d}-01"
+        end = f"{year + month_number // 12:04d}-{month_number % 12 + 1:02d}-01"
+        partitions[name] = (start, end)
+    if not partitions:
+        return
+    
+    cursor.execute(DatabaseSchemaConfig.MISSING_PARTITIONS_QUERY, (list(partitions),))
+    missing = [name for (name,) in cursor.fetchall()]
+    if not missing:
+        return
+    
+    cursor.execute(DatabaseSchemaConfig.PARTITION_LOCK_QUERY)
+    for name in missing:
+        cursor.execute(
+            sql.SQL(DatabaseSchemaConfig.CREATE_PARTITION_QUERY).format(partition=sql.Identifier(name)),
+            partitions[name]
+        )
+        logger.info(f"Created partition {DatabaseSchemaConfig.RAW_SCHEMA}.{name}")
+
+
+def has_message_key(row: Tuple) -> bool:
+    """Whether a row has the id, channel and date that make up its key."""
+    return row[0] is not None and bool(row[1]) and bool(row[2])
+
+
+def prepare_rows(values: List[Tuple]) -> List[Tuple]:
+    """
+    Drop rows without a complete key and collapse duplicate keys.
+    
+    The upsert cannot touch the same row twice in one statement, so only
+    the last row per (channel_name, message_id, message_date) is kept.
+    Partitions for the rows' months are created by the caller.
+    
+    Args:
+        values: List of tuples containing message data.
+        
+    Returns:
+        Rows ready to be inserted.
+    """
+    rows = {}
+    dropped = 0
+    for row in values:
+        if not has_message_key(row):
+            dropped += 1
+            continue
+        rows[(row[1], row[0], row[2])] = row
+    if dropped:
+        logger.warning(f"Skipped {dropped} messages without id, channel or date")
+    return list(rows.values())
+
+
+def row_months(values: List[Tuple]) -> set:
+    """Get the "YYYY-MM" months covered by the message dates of a batch of rows."""
+    return {str(row[2])[:7] for row in values}
+
+
+def fetch_load_manifest(cursor) -> Dict[str, Tuple[int, float, str]]:
+    """
+    Fetch the manifest of data lake files that were already loaded.
+    
+    Args:
+        cursor: Database cursor object.
+        
+    Returns:
+        Mapping of relative file path to (size, mtime, content hash).
+    """
+    cursor.execute(DatabaseSchemaConfig.SELECT_MANIFEST_QUERY)
+    return {
+        file_path: (file_size, file_mtime, content_hash)
+        for file_path, file_size, file_mtime, content_hash in cursor.fetchall()
+    }
+
+
+def hash_file(file_path: str) -> str:
+    """
+    Compute the SHA-256 of a file's contents.
+    
+    Args:
+        file_path: Path to the file.
+        
+    Returns:
+        Hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def check_manifest(
+    cursor,
+    manifest: Dict[str, Tuple[int, float, str]],
+    file_path: str,
+    manifest_key: str
+) -> Optional[Tuple[int, float, str]]:
+    """
+    Decide whether a data lake file needs to be (re)loaded.
+    
+    Files whose size and mtime match the manifest are skipped without being
+    read. If only the mtime moved but the content hash is unchanged, the
+    manifest entry is refreshed and the file is still skipped.
+    
+    Args:
+        cursor: Database cursor object.
+        manifest: Manifest fetched at the start of the run.
+        file_path: Path to the file.
+        manifest_key: Path of the file relative to the data lake root.
+        
+    Returns:
+        The file's (size, mtime, content hash) if it must be loaded,
+        or None if it is unchanged.
+    """
+    stat = os.stat(file_path)
+    recorded = manifest.get(manifest_key)
+    
+    if recorded and recorded[0] == stat.st_size and recorded[1] == stat.st_mtime:
+        return None
+    
+    content_hash = hash_file(file_path)
+    if recorded and recorded[2] == content_hash:
+        cursor.execute(
+            DatabaseSchemaConfig.UPSERT_MANIFEST_QUERY,
+            (manifest_key, stat.st_size, stat.st_mtime, content_hash, None)
+        )
+        return None
+    
+    return stat.st_size, stat.st_mtime, content_hash
+
+
+def record_loaded_file(
+    cursor,
+    manifest_key: str,
+    fingerprint: Tuple[int, float, str],
+    row_count: int
+) -> None:
+    """
+    Record a loaded file in the manifest.
+    
+    Args:
+        cursor: Database cursor object.
+        manifest_key: Path of the file relative to the data lake root.
+        fingerprint: The file's (size, mtime, content hash).
+        row_count: Number of messages read from the file.
+    """
+    file_size, file_mtime, content_hash = fingerprint
+    cursor.execute(
+        DatabaseSchemaConfig.UPSERT_MANIFEST_QUERY,
+        (manifest_key, file_size, file_mtime, content_hash, row_count)
+    )
+
+
+def parse_message_data(messages: Iterable[dict]) -> List[Tuple]:
     """
     Parse message dictionaries into tuples for database insertion.
     
     Args:
-        messages: List of message dictionaries from JSON files.
+        messages: Message dictionaries from JSON files.
         
     Returns:
         List of tuples containing message data in database format.
@@ -100,30 +317,27 @@ def parse_message_data(messages: List[dict]) -> List[Tuple]:
     ]
 
 
-def load_json_file(file_path: str) -> Optional[List[dict]]:
+def iter_message_rows(file_path: str, chunk_size: Optional[int] = None) -> Iterator[List[Tuple]]:
     """
-    Load and parse a JSON file containing messages.
+    Stream a message file as chunks of database rows.
+    
+    Only one chunk of messages and its rows are held in memory at a time,
+    so memory is bounded by chunk size instead of file size.
     
     Args:
-        file_path: Path to the JSON file.
+        file_path: Path to the message file.
+        chunk_size: Messages per chunk. Defaults to LoaderConfig.PARSE_CHUNK_SIZE.
         
-    Returns:
-        List of message dictionaries, or None if file cannot be read.
+    Yields:
+        Lists of tuples containing message data in database format.
+        
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not valid JSON.
     """
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            messages = json.load(f)
-            logger.debug(f"Loaded {len(messages)} messages from {file_path}")
-            return messages
-    except FileNotFoundError:
-        logger.warning(f"File not found: {file_path}")
-        return None
-    except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON in file {file_path}: {e}")
-        return None
-    except Exception as e:
-        logger.error(f"Error reading file {file_path}: {e}")
-        return None
+    chunk_size = chunk_size or LoaderConfig.PARSE_CHUNK_SIZE
+    for messages in iter_message_chunks(file_path, chunk_size):
+        yield parse_message_data(messages)
 
 
 def insert_messages_batch(cursor, values: List[Tuple], file_path: str) -> None:
@@ -138,27 +352,204 @@ def insert_messages_batch(cursor, values: List[Tuple], file_path: str) -> None:
     Raises:
         psycopg2.Error: If database insertion fails.
     """
+    query = (
+        DatabaseSchemaConfig.UPSERT_QUERY
+        if LoaderConfig.REFRESH_ENGAGEMENT
+        else DatabaseSchemaConfig.INSERT_QUERY
+    )
     try:
+        values = prepare_rows(values)
+        ensure_partitions(cursor, row_months(values))
         execute_values(
             cursor,
-            DatabaseSchemaConfig.INSERT_QUERY,
+            query,
             values
         )
         logger.debug(f"Inserted {len(values)} messages from {file_path}")
     except psycopg2.IntegrityError as e:
+        # The transaction is aborted now; the caller rolls this file back and
+        # continues with the other files
         logger.warning(f"Integrity error inserting messages from {file_path}: {e}")
-        # Continue processing other files even if one has integrity issues
+        raise
     except psycopg2.Error as e:
         logger.error(f"Database error inserting messages from {file_path}: {e}")
         raise
 
 
-def process_data_lake_files(cursor) -> int:
+def format_copy_value(value) -> str:
     """
-    Process all JSON files in the data lake directory.
+    Format a Python value as a field of PostgreSQL's COPY text format.
+    
+    Args:
+        value: Value to format.
+        
+    Returns:
+        Escaped field text, with NULL written as \\N.
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class BulkMessageLoader:
+    """
+    Stream message rows into PostgreSQL through COPY and set-based merges.
+    
+    Rows are buffered across files and, every batch_size rows, copied into a
+    session-local staging table and merged into raw.telegram_messages with a
+    single INSERT ... SELECT. Existing messages get their engagement counts
+    refreshed when LoaderConfig.REFRESH_ENGAGEMENT is set. Counts of inserted,
+    updated, skipped and invalid rows are kept for the final report.
+    """
+    
+    def __init__(self, cursor, batch_size: Optional[int] = None):
+        """
+        Args:
+            cursor: Database cursor object.
+            batch_size: Rows per COPY/merge batch. Defaults to LoaderConfig.BULK_BATCH_SIZE.
+        """
+        self.cursor = cursor
+        self.batch_size = batch_size or LoaderConfig.BULK_BATCH_SIZE
+        self.buffer: List[Tuple] = []
+        self.rows_staged = 0
+        self.rows_invalid = 0
+        self.rows_inserted = 0
+        self.rows_updated = 0
+        self.merge_query = DatabaseSchemaConfig.MERGE_STAGING_QUERY.format(
+            on_conflict=(
+                DatabaseSchemaConfig.ON_CONFLICT_REFRESH
+                if LoaderConfig.REFRESH_ENGAGEMENT
+                else DatabaseSchemaConfig.ON_CONFLICT_IGNORE
+            )
+        )
+        self.started_at = time.perf_counter()
+        
+        cursor.execute(DatabaseSchemaConfig.CREATE_STAGING_TABLE_QUERY)
+    
+    @property
+    def rows_skipped(self) -> int:
+        """Valid rows neither inserted nor updated: unchanged conflicts and in-batch duplicates."""
+        return self.rows_staged - self.rows_invalid - self.rows_inserted - self.rows_updated
+    
+    def add(self, values: List[Tuple]) -> None:
+        """
+        Buffer parsed message rows, flushing full batches.
+        
+        Args:
+            values: List of tuples containing message data.
+        """
+        self.buffer.extend(values)
+        while len(self.buffer) >= self.batch_size:
+            batch = self.buffer[:self.batch_size]
+            self.buffer = self.buffer[self.batch_size:]
+            self._load_batch(batch)
+    
+    def checkpoint(self) -> Tuple:
+        """
+        Snapshot the buffer and counters, to undo a file that fails to read.
+        
+        Pair with a savepoint taken at the same time: after rolling back to
+        it, restore() puts back the rows buffered before the file started,
+        including any that were merged (and rolled back) together with the
+        failed file's rows.
+        """
+        return list(self.buffer), self.rows_staged, self.rows_invalid, self.rows_inserted, self.rows_updated
+    
+    def restore(self, checkpoint: Tuple) -> None:
+        """Return to a state saved by checkpoint()."""
+        buffer, self.rows_staged, self.rows_invalid, self.rows_inserted, self.rows_updated = checkpoint
+        self.buffer = list(buffer)
+    
+    def flush(self) -> None:
+        """Load any rows left in the buffer."""
+        if self.buffer:
+            batch, self.buffer = self.buffer, []
+            self._load_batch(batch)
+    
+    def _load_batch(self, batch: List[Tuple]) -> None:
+        staged = len(batch)
+        invalid = sum(1 for row in batch if not has_message_key(row))
+        batch = prepare_rows(batch)
+        data = io.StringIO()
+        for row in batch:
+            data.write("\t".join(format_copy_value(value) for value in row))
+            data.write("\n")
+        data.seek(0)
+        
+        try:
+            ensure_partitions(self.cursor, row_months(batch))
+            self.cursor.copy_expert(DatabaseSchemaConfig.COPY_STAGING_QUERY, data)
+            self.cursor.execute(self.merge_query)
+            inserted, updated = self.cursor.fetchone()
+            self.cursor.execute(DatabaseSchemaConfig.TRUNCATE_STAGING_QUERY)
+        except psycopg2.Error as e:
+            logger.error(f"Database error bulk loading {len(batch)} messages: {e}")
+            raise
+        
+        self.rows_staged += staged
+        self.rows_invalid += invalid
+        self.rows_inserted += inserted
+        self.rows_updated += updated
+        logger.debug(
+            f"Bulk loaded batch of {staged} messages ({inserted} new, {updated} refreshed)"
+        )
+    
+    def log_stats(self) -> None:
+        """Log throughput and insert/conflict counts of the load."""
+        elapsed = time.perf_counter() - self.started_at
+        rate = self.rows_staged / elapsed if elapsed else 0.0
+        logger.info(
+            f"Bulk load: {self.rows_staged} rows in {elapsed:.2f}s ({rate:.0f} rows/sec), "
+            f"{self.rows_inserted} inserted, {self.rows_updated} refreshed, "
+            f"{self.rows_skipped} skipped as unchanged conflicts or duplicates, "
+            f"{self.rows_invalid} invalid (no id, channel or date)"
+        )
+
+
+def find_message_files(data_lake_path: str) -> Iterator[Tuple[str, str]]:
+    """
+    Walk the data lake for message files.
+    
+    Args:
+        data_lake_path: Root directory of the data lake.
+        
+    Yields:
+        Tuples of (file path, path relative to the data lake root).
+    """
+    for root, dirs, files in os.walk(data_lake_path):
+        for file in sorted(files):
+            if is_message_file(file):
+                file_path = os.path.join(root, file)
+                yield file_path, os.path.relpath(file_path, data_lake_path)
+
+
+def process_data_lake_files(
+    cursor,
+    bulk: bool = False,
+    batch_size: Optional[int] = None,
+    full_reload: bool = False
+) -> int:
+    """
+    Process new or modified message files in the data lake directory.
+    
+    Files recorded in raw.load_manifest with an unchanged size/mtime or
+    content hash are skipped. Each loaded file is recorded in the manifest
+    in the same transaction as its rows.
     
     Args:
         cursor: Database cursor object.
+        bulk: Load through COPY and set-based merges instead of per-file
+            INSERT statements.
+        batch_size: Rows per bulk batch. Defaults to LoaderConfig.BULK_BATCH_SIZE.
+        full_reload: Ignore the manifest and load every file.
         
     Returns:
         Number of files processed successfully.
@@ -168,52 +559,344 @@ def process_data_lake_files(cursor) -> int:
     """
     data_lake_path = DataPathsConfig.DATA_LAKE_PATH
     files_processed = 0
+    files_skipped = 0
+    files_failed = 0
     
     if not os.path.exists(data_lake_path):
         logger.warning(f"Data lake path does not exist: {data_lake_path}")
         return files_processed
     
-    logger.info(f"Processing JSON files from: {data_lake_path}")
+    logger.info(f"Processing message files from: {data_lake_path}")
+    bulk_loader = BulkMessageLoader(cursor, batch_size) if bulk else None
+    manifest = {} if full_reload else fetch_load_manifest(cursor)
     
     try:
-        for root, dirs, files in os.walk(data_lake_path):
-            for file in files:
-                if file.endswith(".json"):
-                    file_path = os.path.join(root, file)
-                    
-                    # Load messages from JSON file
-                    messages = load_json_file(file_path)
-                    if messages is None:
-                        continue
-                    
-                    # Parse messages into database format
-                    values = parse_message_data(messages)
-                    if not values:
-                        logger.warning(f"No valid messages found in {file_path}")
-                        continue
-                    
-                    # Insert messages into database
-                    try:
+        for file_path, manifest_key in find_message_files(data_lake_path):
+            # Skip files already loaded with the same contents
+            fingerprint = check_manifest(cursor, manifest, file_path, manifest_key)
+            if fingerprint is None:
+                files_skipped += 1
+                continue
+            
+            # Stream the file into the database chunk by chunk, isolated in a
+            # savepoint so a failure does not abort the rest of the transaction.
+            # In bulk mode the loader's buffer is checkpointed with it, so rows
+            # of a file that fails to read are never merged.
+            cursor.execute("SAVEPOINT load_file")
+            checkpoint = bulk_loader.checkpoint() if bulk_loader else None
+            row_count = 0
+            try:
+                for values in iter_message_rows(file_path):
+                    if bulk_loader:
+                        bulk_loader.add(values)
+                    else:
                         insert_messages_batch(cursor, values, file_path)
-                        files_processed += 1
-                    except psycopg2.Error:
-                        # Error already logged in insert_messages_batch
-                        # Continue processing other files
-                        continue
+                    row_count += len(values)
+                
+                # Inside the try, so a failure here also rolls back only this file
+                if row_count:
+                    record_loaded_file(cursor, manifest_key, fingerprint, row_count)
+                cursor.execute("RELEASE SAVEPOINT load_file")
+            except psycopg2.Error:
+                # Error already logged; continue processing other files
+                if bulk_loader:
+                    raise
+                cursor.execute("ROLLBACK TO SAVEPOINT load_file")
+                files_failed += 1
+                continue
+            except (OSError, ValueError, RuntimeError) as e:
+                logger.error(f"Error reading file {file_path}: {e}")
+                cursor.execute("ROLLBACK TO SAVEPOINT load_file")
+                if bulk_loader:
+                    bulk_loader.restore(checkpoint)
+                files_failed += 1
+                continue
+            
+            if row_count:
+                files_processed += 1
+            else:
+                logger.warning(f"No valid messages found in {file_path}")
+        
+        if bulk_loader:
+            bulk_loader.flush()
+            bulk_loader.log_stats()
         
-        logger.info(f"Successfully processed {files_processed} JSON files")
+        logger.info(
+            f"Successfully processed {files_processed} message files, "
+            f"{files_failed} failed, skipped {files_skipped} unchanged files"
+        )
         return files_processed
     except Exception as e:
         logger.error(f"Unexpected error processing data lake files: {e}")
         raise
 
 
-def main() -> None:
+def parse_file(file_path: str) -> Optional[Tuple[str, int]]:
+    """
+    Parse one message file into a spill file of row chunks.
+    
+    Runs in a worker process during parallel ingestion, since JSON
+    decoding is CPU-bound. Each chunk of rows is pickled to a temporary
+    file as soon as it is parsed instead of being returned, so neither the
+    worker nor the inserting process holds more than one chunk of a file
+    at a time, whatever the file size.
+    
+    Args:
+        file_path: Path to the message file.
+        
+    Returns:
+        Tuple of (spill file path, number of rows), or None if the file
+        cannot be read.
+    """
+    fd, spill_path = tempfile.mkstemp(prefix="load_raw_", suffix=".pickle", dir=LoaderConfig.SPILL_DIR)
+    row_count = 0
+    try:
+        with os.fdopen(fd, "wb") as spill:
+            for values in iter_message_rows(file_path):
+                pickle.dump(values, spill, protocol=pickle.HIGHEST_PROTOCOL)
+                row_count += len(values)
+        return spill_path, row_count
+    except (OSError, ValueError, RuntimeError) as e:
+        logger.error(f"Error reading file {file_path}: {e}")
+        os.remove(spill_path)
+        return None
+    except Exception:
+        os.remove(spill_path)
+        raise
+
+
+def iter_spilled_rows(spill_path: str) -> Iterator[List[Tuple]]:
+    """
+    Read back the row chunks written by parse_file, one chunk at a time.
+    
+    Args:
+        spill_path: Spill file produced by parse_file.
+        
+    Yields:
+        Lists of tuples containing message data in database format.
+    """
+    with open(spill_path, "rb") as spill:
+        while True:
+            try:
+                yield pickle.load(spill)
+            except EOFError:
+                return
+
+
+def load_parsed_file(
+    pool: ThreadedConnectionPool,
+    file_path: str,
+    manifest_key: str,
+    fingerprint: Tuple[int, float, str],
+    spill_path: str,
+    row_count: int,
+    bulk: bool = False,
+    batch_size: Optional[int] = None
+) -> Optional[int]:
+    """
+    Insert one parsed file's rows on a pooled connection and commit them.
+    
+    Rows are streamed from the spill file chunk by chunk. They and the
+    file's manifest entry are committed together in their own transaction,
+    so a failing file only rolls back itself. The spill file is removed
+    afterwards either way.
+    
+    Args:
+        pool: Connection pool shared by the insert workers.
+        file_path: Path to the source file (for logging).
+        manifest_key: Path of the file relative to the data lake root.
+        fingerprint: The file's (size, mtime, content hash).
+        spill_path: Spill file produced by parse_file.
+        row_count: Number of rows in the spill file.
+        bulk: Load through COPY and a set-based merge.
+        batch_size: Rows per bulk batch. Defaults to LoaderConfig.BULK_BATCH_SIZE.
+        
+    Returns:
+        Number of rows inserted (rows read, outside bulk mode),
+        or None if the file failed.
+    """
+    conn = None
+    broken = False
+    try:
+        conn = pool.getconn()
+        with conn.cursor() as cursor:
+            bulk_loader = BulkMessageLoader(cursor, batch_size) if bulk else None
+            for values in iter_spilled_rows(spill_path):
+                if bulk_loader:
+                    bulk_loader.add(values)
+                else:
+                    insert_messages_batch(cursor, values, file_path)
+            if bulk_loader:
+                bulk_loader.flush()
+                inserted = bulk_loader.rows_inserted
+            else:
+                inserted = row_count
+            record_loaded_file(cursor, manifest_key, fingerprint, row_count)
+        conn.commit()
+        return inserted
+    except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+        # The connection itself failed; it must not go back into the pool
+        broken = True
+        logger.error(f"Failed to load {file_path}; connection lost, its rows were not committed: {e}")
+        return None
+    except Exception as e:
+        if conn is not None:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
+        logger.error(f"Failed to load {file_path}; rolled back its rows: {e}")
+        return None
+    finally:
+        if conn is not None:
+            pool.putconn(conn, close=broken or bool(conn.closed))
+        os.remove(spill_path)
+
+
+def process_data_lake_files_parallel(
+    conn,
+    workers: int,
+    db_workers: Optional[int] = None,
+    bulk: bool = False,
+    batch_size: Optional[int] = None,
+    full_reload: bool = False
+) -> int:
+    """
+    Load new or modified message files with parallel parsing and inserts.
+    
+    A process pool parses files while a thread pool inserts parsed files on
+    connections from a ThreadedConnectionPool. Each file is committed in its
+    own transaction, so failures are isolated per file. Parsed rows travel
+    through temporary spill files (LoaderConfig.SPILL_DIR) a chunk at a
+    time, so memory is bounded by chunk size; the number of files parsed or
+    waiting to be inserted is bounded to limit the disk they use.
+    
+    Args:
+        conn: Connection used for the manifest check.
+        workers: Number of parser processes.
+        db_workers: Number of insert threads and pooled connections.
+            Defaults to LoaderConfig.DB_WORKERS.
+        bulk: Load each file through COPY and a set-based merge.
+        batch_size: Rows per bulk batch. Defaults to LoaderConfig.BULK_BATCH_SIZE.
+        full_reload: Ignore the manifest and load every file.
+        
+    Returns:
+        Number of files loaded successfully.
+    """
+    data_lake_path = DataPathsConfig.DATA_LAKE_PATH
+    db_workers = db_workers or LoaderConfig.DB_WORKERS
+    
+    if not os.path.exists(data_lake_path):
+        logger.warning(f"Data lake path does not exist: {data_lake_path}")
+        return 0
+    
+    logger.info(
+        f"Processing message files from: {data_lake_path} "
+        f"with {workers} parsers and {db_workers} connections"
+    )
+    
+    # Decide which files need loading, committing refreshed manifest entries
+    files_skipped = 0
+    pending_files = []
+    with conn.cursor() as cursor:
+        manifest = {} if full_reload else fetch_load_manifest(cursor)
+        for file_path, manifest_key in find_message_files(data_lake_path):
+            fingerprint = check_manifest(cursor, manifest, file_path, manifest_key)
+            if fingerprint is None:
+                files_skipped += 1
+            else:
+                pending_files.append((file_path, manifest_key, fingerprint))
+    conn.commit()
+    
+    files_processed = 0
+    files_failed = 0
+    rows_inserted = 0
+    started_at = time.perf_counter()
+    max_in_flight = 2 * (workers + db_workers)
+    
+    pool = ThreadedConnectionPool(1, db_workers, **DatabaseConfig.get_connection_params())
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as parsers, \
+                ThreadPoolExecutor(max_workers=db_workers) as inserters:
+            remaining = iter(pending_files)
+            parsing = {}
+            inserting = {}
+            
+            def submit_parses() -> None:
+                while len(parsing) + len(inserting) < max_in_flight:
+                    entry = next(remaining, None)
+                    if entry is None:
+                        return
+                    parsing[parsers.submit(parse_file, entry[0])] = entry
+            
+            submit_parses()
+            while parsing or inserting:
+                done, _ = wait(list(parsing) + list(inserting), return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in parsing:
+                        file_path, manifest_key, fingerprint = parsing.pop(future)
+                        try:
+                            parsed = future.result()
+                        except Exception as e:
+                            logger.error(f"Failed to parse {file_path}: {e}")
+                            files_failed += 1
+                            continue
+                        if parsed is None:
+                            # Read or parse error, already logged by the worker
+                            files_failed += 1
+                            continue
+                        spill_path, row_count = parsed
+                        if not row_count:
+                            os.remove(spill_path)
+                            logger.warning(f"No valid messages found in {file_path}")
+                            continue
+                        insert = inserters.submit(
+                            load_parsed_file, pool, file_path, manifest_key,
+                            fingerprint, spill_path, row_count, bulk, batch_size
+                        )
+                        inserting[insert] = file_path
+                    else:
+                        inserting.pop(future)
+                        inserted = future.result()
+                        if inserted is None:
+                            files_failed += 1
+                        else:
+                            files_processed += 1
+                            rows_inserted += inserted
+                submit_parses()
+    finally:
+        pool.closeall()
+    
+    elapsed = time.perf_counter() - started_at
+    logger.info(
+        f"Parallel load: {files_processed} files loaded, {files_failed} failed, "
+        f"{files_skipped} unchanged files skipped; {rows_inserted} rows in {elapsed:.2f}s"
+    )
+    return files_processed
+
+
+def main(
+    bulk: bool = False,
+    batch_size: Optional[int] = None,
+    full_reload: bool = False,
+    workers: Optional[int] = None,
+    db_workers: Optional[int] = None
+) -> None:
     """
     Main entry point for loading raw data into PostgreSQL.
     
     Orchestrates database connection, schema creation, and data loading.
+    
+    Args:
+        bulk: Load through COPY and set-based merges.
+        batch_size: Rows per bulk batch. Defaults to LoaderConfig.BULK_BATCH_SIZE.
+        full_reload: Ignore the load manifest and reload every file.
+        workers: Parser processes for parallel ingestion. Defaults to
+            LoaderConfig.PARSE_WORKERS; 0 loads serially on one connection.
+        db_workers: Pooled insert connections for parallel ingestion.
+            Defaults to LoaderConfig.DB_WORKERS.
     """
+    workers = LoaderConfig.PARSE_WORKERS if workers is None else workers
     conn = None
     cursor = None
     
@@ -227,8 +910,13 @@ def main() -> None:
         conn.commit()
         
         # Process and load JSON files
-        files_processed = process_data_lake_files(cursor)
-        conn.commit()
+        if workers > 0:
+            files_processed = process_data_lake_files_parallel(
+                conn, workers, db_workers, bulk, batch_size, full_reload
+            )
+        else:
+            files_processed = process_data_lake_files(cursor, bulk, batch_size, full_reload)
+            conn.commit()
         
         logger.info(f"Successfully loaded raw data. Processed {files_processed} files.")
         print("All raw JSON data loaded into PostgreSQL.")
@@ -253,5 +941,46 @@ def main() -> None:
             logger.debug("Database connection closed")
 
 
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments for the raw loader."""
+    parser = argparse.ArgumentParser(description="Load raw Telegram messages into PostgreSQL")
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Load through COPY into a staging table and merge set-based"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Rows per bulk COPY/merge batch"
+    )
+    parser.add_argument(
+        "--full-reload",
+        action="store_true",
+        help="Ignore the load manifest and reload every data lake file"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Parser processes for parallel ingestion (0 loads serially)"
+    )
+    parser.add_argument(
+        "--db-workers",
+        type=int,
+        default=None,
+        help="Pooled database connections for parallel ingestion"
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    main(
+        bulk=args.bulk,
+        batch_size=args.batch_size,
+        full_reload=args.full_reload,
+        workers=args.workers,
+        db_workers=args.db_workers
+    )
@@ -1,33 +1,61 @@
 # src/load_yolo_to_postgres.py
 
+import io
 import csv
+import time
+import argparse
 import psycopg2
 from pathlib import Path
 
+from config import DatabaseConfig, DatabaseSchemaConfig
+
 # -----------------------------
 # Configuration
 # -----------------------------
 CSV_FILE = Path("data/processed/yolo_detections.csv")
 
-DB_CONFIG = {
-    "dbname": "medical_warehouse",
-    "user": "postgres",
-    "password": "12345678",
-    "host": "localhost",
-    "port": 5432,
-}
+# -----------------------------
+# Table setup
+# -----------------------------
+def create_yolo_table(cur):
+    """
+    Create the YOLO tables (image-level and per-box) and their indexes if missing.
+    """
+    cur.execute(DatabaseSchemaConfig.CREATE_SCHEMA_QUERY)
+    cur.execute(DatabaseSchemaConfig.CREATE_YOLO_TABLE_QUERY)
+    cur.execute(DatabaseSchemaConfig.CREATE_YOLO_BOXES_TABLES_QUERY)
 
 # -----------------------------
 # Load CSV into PostgreSQL
 # -----------------------------
-def load_yolo_csv():
-    if not CSV_FILE.exists():
-        raise FileNotFoundError(f"CSV file not found: {CSV_FILE}")
+def bulk_load_csv(cur, csv_file: Path):
+    """
+    Stream the CSV through COPY into a staging table and merge it set-based.
 
-    conn = psycopg2.connect(**DB_CONFIG)
-    cur = conn.cursor()
+    Returns:
+        tuple: (rows staged, rows inserted, rows updated)
+    """
+    cur.execute(DatabaseSchemaConfig.CREATE_YOLO_STAGING_TABLE_QUERY)
+
+    with open(csv_file, "r", encoding="utf-8") as f:
+        cur.copy_expert(DatabaseSchemaConfig.COPY_YOLO_STAGING_QUERY, f)
+    staged = cur.rowcount
+
+    cur.execute(DatabaseSchemaConfig.MERGE_YOLO_STAGING_QUERY)
+    inserted, updated = cur.fetchone()
+    return staged, inserted, updated
+
+
+def row_load_csv(cur, csv_file: Path):
+    """
+    Insert the CSV one row at a time (the original, slow path).
+
+    Returns:
+        tuple: (rows read, rows inserted, rows updated)
+    """
+    rows = inserted = 0
 
-    with open(CSV_FILE, "r", encoding="utf-8") as f:
+    with open(csv_file, "r", encoding="utf-8") as f:
         reader = csv.DictReader(f)
 
         for row in reader:
@@ -49,15 +77,147 @@ def load_yolo_csv():
                     row["confidence_score"],
                 )
             )
+            rows += 1
+            inserted += cur.rowcount
 
-    conn.commit()
-    cur.close()
-    conn.close()
+    return rows, inserted, 0
 
-    print("✅ YOLO CSV loaded into raw.yolo_detections")
+
+def load_yolo_csv(csv_file: Path = CSV_FILE, bulk: bool = True):
+    """
+    Load YOLO detection results from CSV into raw.yolo_detections.
+
+    Args:
+        csv_file (Path): CSV written by yolo_detect.py
+        bulk (bool): Use COPY and a set-based upsert instead of per-row INSERTs
+    """
+    if not csv_file.exists():
+        raise FileNotFoundError(f"CSV file not found: {csv_file}")
+
+    conn = psycopg2.connect(**DatabaseConfig.get_connection_params())
+    cur = conn.cursor()
+
+    try:
+        create_yolo_table(cur)
+
+        start = time.perf_counter()
+        if bulk:
+            rows, inserted, updated = bulk_load_csv(cur, csv_file)
+        else:
+            rows, inserted, updated = row_load_csv(cur, csv_file)
+        conn.commit()
+        elapsed = time.perf_counter() - start
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+    rate = rows / elapsed if elapsed else 0.0
+    print(
+        f"✅ YOLO CSV loaded into raw.yolo_detections: {rows} rows in {elapsed:.2f}s "
+        f"({rate:.0f} rows/sec), {inserted} inserted, {updated} updated, "
+        f"{rows - inserted - updated} unchanged"
+    )
+
+# -----------------------------
+# Stream per-box detections
+# -----------------------------
+class YoloBoxLoader:
+    """
+    Stream per-box detections into raw.yolo_images and raw.yolo_boxes.
+
+    Rows are buffered and written in batches through COPY into staging
+    tables, then merged set-based; each batch is committed, so an interrupted
+    run keeps everything flushed so far.
+    """
+
+    def __init__(self, conn, batch_size: int):
+        """
+        Args:
+            conn: psycopg2 connection
+            batch_size (int): Boxes buffered before each flush
+        """
+        self.conn = conn
+        self.cur = conn.cursor()
+        self.batch_size = batch_size
+        self.images = []
+        self.boxes = []
+        self.images_loaded = 0
+        self.boxes_loaded = 0
+
+        create_yolo_table(self.cur)
+        self.cur.execute(DatabaseSchemaConfig.CREATE_YOLO_BOXES_STAGING_QUERY)
+        self.conn.commit()
+
+    def loaded_hashes(self, model_key: str) -> dict:
+        """
+        Get content hashes of images already detected with a model.
+
+        Returns:
+            dict: (channel_name, image_name) -> content_hash
+        """
+        self.cur.execute(DatabaseSchemaConfig.SELECT_YOLO_IMAGES_QUERY, (model_key,))
+        return {(channel, name): content_hash for channel, name, content_hash in self.cur.fetchall()}
+
+    def add(self, channel_name: str, image_name: str, content_hash: str, model_key: str, boxes: list):
+        """
+        Queue one image and its boxes, flushing when the batch is full.
+
+        Args:
+            channel_name (str): Channel the image belongs to
+            image_name (str): Image file name
+            content_hash (str): SHA-256 of the image contents
+            model_key (str): Model and settings the boxes came from
+            boxes (list): (box_index, class_id, class_name, confidence, x1, y1, x2, y2) tuples
+        """
+        self.images.append((channel_name, image_name, content_hash, model_key, len(boxes)))
+        self.boxes.extend((channel_name, image_name, *box) for box in boxes)
+
+        if len(self.boxes) >= self.batch_size or len(self.images) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write buffered images and boxes and commit them."""
+        if not self.images:
+            return
+
+        for query, rows in (
+            (DatabaseSchemaConfig.COPY_YOLO_IMAGES_STAGING_QUERY, self.images),
+            (DatabaseSchemaConfig.COPY_YOLO_BOXES_STAGING_QUERY, self.boxes),
+        ):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            self.cur.copy_expert(query, buffer)
+
+        self.cur.execute(DatabaseSchemaConfig.MERGE_YOLO_BOXES_QUERY)
+        self.conn.commit()
+
+        self.images_loaded += len(self.images)
+        self.boxes_loaded += len(self.boxes)
+        self.images = []
+        self.boxes = []
+
+    def close(self):
+        """Flush what is left and close the cursor."""
+        try:
+            self.flush()
+        finally:
+            self.cur.close()
 
 # -----------------------------
 # Entry point
 # -----------------------------
 if __name__ == "__main__":
-    load_yolo_csv()
+    parser = argparse.ArgumentParser(description="Load YOLO detections into PostgreSQL")
+    parser.add_argument("--csv", type=Path, default=CSV_FILE, help="Detections CSV to load")
+    parser.add_argument(
+        "--row-by-row",
+        action="store_true",
+        help="Insert one row at a time instead of COPY + set-based upsert"
+    )
+    args = parser.parse_args()
+
+    load_yolo_csv(args.csv, bulk=not args.row_by_row)
@@ -0,0 +1,146 @@
+"""
+Asynchronous media download worker pool for the Telegram scraper.
+
+Message iteration enqueues photos on a bounded queue and keeps going, while a
+fixed number of workers download them concurrently. Each message record gets
+its image_path filled in once its photo is on disk.
+"""
+import asyncio
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from telethon import TelegramClient
+
+from config import ScraperConfig
+from rate_limiter import AdaptiveRateLimiter, download_media_limited
+
+
+def expected_photo_size(media) -> Optional[int]:
+    """
+    Get the byte size of the largest version of a photo, if Telegram reports it.
+
+    Args:
+        media: Telethon MessageMediaPhoto object.
+
+    Returns:
+        Size in bytes of the version download_media fetches, or None if unknown.
+    """
+    photo = getattr(media, "photo", None)
+    sizes = []
+    for photo_size in getattr(photo, "sizes", None) or []:
+        if getattr(photo_size, "size", None):
+            sizes.append(photo_size.size)
+        elif getattr(photo_size, "sizes", None):
+            # PhotoSizeProgressive lists the sizes of each progressive pass
+            sizes.append(max(photo_size.sizes))
+    return max(sizes) if sizes else None
+
+
+def is_already_downloaded(image_file: Path, media) -> bool:
+    """
+    Check whether an image was fully downloaded by a previous run.
+
+    Args:
+        image_file: Target path of the image.
+        media: Telethon MessageMediaPhoto object.
+
+    Returns:
+        True if the file exists and matches the expected size.
+    """
+    if not image_file.exists():
+        return False
+
+    size = image_file.stat().st_size
+    expected = expected_photo_size(media)
+    if expected is None:
+        return size > 0
+    return size == expected
+
+
+class MediaDownloadPool:
+    """
+    Bounded queue of photo downloads drained by a pool of async workers.
+
+    Use as an async context manager; call drain() before saving records so
+    every image_path has been filled in.
+    """
+
+    def __init__(
+        self,
+        client: TelegramClient,
+        channel_name: str,
+        limiter: AdaptiveRateLimiter,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None
+    ):
+        """
+        Args:
+            client: TelegramClient instance used for downloads.
+            channel_name: Name of the channel the downloads belong to.
+            limiter: Rate limiter shared with the other Telegram calls.
+            workers: Number of concurrent download workers.
+                Defaults to ScraperConfig.MEDIA_DOWNLOAD_WORKERS.
+            queue_size: Maximum pending downloads before iteration blocks.
+                Defaults to ScraperConfig.MEDIA_QUEUE_SIZE.
+        """
+        self.client = client
+        self.channel_name = channel_name
+        self.limiter = limiter
+        self.workers = max(1, workers or ScraperConfig.MEDIA_DOWNLOAD_WORKERS)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or ScraperConfig.MEDIA_QUEUE_SIZE)
+        self.downloaded = 0
+        self.skipped = 0
+        self.failed = 0
+        self._tasks: List[asyncio.Task] = []
+
+    async def __aenter__(self) -> "MediaDownloadPool":
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, media, record: Dict[str, Any], image_file: Path) -> None:
+        """
+        Queue a photo download, waiting if the queue is full.
+
+        Args:
+            media: Telethon MessageMediaPhoto object.
+            record: Message dictionary whose image_path is set on completion.
+            image_file: Target path of the image.
+        """
+        await self.queue.put((media, record, image_file))
+
+    async def drain(self) -> None:
+        """Wait until every queued download has finished."""
+        await self.queue.join()
+
+    async def _worker(self) -> None:
+        while True:
+            media, record, image_file = await self.queue.get()
+            try:
+                await self._download(media, record, image_file)
+            finally:
+                self.queue.task_done()
+
+    async def _download(self, media, record: Dict[str, Any], image_file: Path) -> None:
+        if is_already_downloaded(image_file, media):
+            self.skipped += 1
+            record["image_path"] = str(image_file)
+            return
+
+        try:
+            await download_media_limited(
+                self.client, self.limiter, self.channel_name, media, image_file
+            )
+        except Exception as e:
+            self.failed += 1
+            logging.warning(f"Failed to download {image_file}: {e}")
+            return
+
+        self.downloaded += 1
+        record["image_path"] = str(image_file)
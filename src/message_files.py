@@ -0,0 +1,342 @@
+"""
+Data lake message file formats.
+
+The scraper streams messages into append-only JSON Lines part files,
+partitioned as telegram_messages/<date>/<channel>/part-*.jsonl[.gz|.zst] and
+rotated by size. Older runs wrote one JSON array per channel and day
+(telegram_messages/<date>/<channel>.json); load_raw reads both layouts.
+"""
+import io
+import os
+import re
+import gzip
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional
+    zstandard = None
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:  # orjson is an optional, faster JSON backend
+    json_loads = json.loads
+
+from config import DataPathsConfig, ScraperConfig
+
+
+COMPRESSION_EXTENSIONS: Dict[str, str] = {
+    "none": "",
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+MESSAGE_FILE_SUFFIXES = (".json", ".jsonl", ".jsonl.gz", ".jsonl.zst")
+
+
+def is_message_file(file_name: str) -> bool:
+    """Check whether a data lake file name is a legacy array or a JSONL part."""
+    return file_name.endswith(MESSAGE_FILE_SUFFIXES)
+
+
+def open_message_file(file_path: str):
+    """
+    Open a data lake file for binary reading, decompressing gzip/zstd parts.
+
+    Args:
+        file_path: Path to the file.
+
+    Returns:
+        Binary file object.
+    """
+    file_path = str(file_path)
+    if file_path.endswith(".gz"):
+        return gzip.open(file_path, "rb")
+    if file_path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst message files")
+        # Part files are written as a series of frames, one per flush
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(
+            open(file_path, "rb"), read_across_frames=True, closefd=True
+        ))
+    return open(file_path, "rb")
+
+
+def iter_jsonl_messages(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield messages from a JSON Lines part file.
+
+    A truncated last line, left behind if the scraper crashed mid-write,
+    is skipped with a warning so every complete line is still loaded.
+
+    Args:
+        file_path: Path to the .jsonl, .jsonl.gz or .jsonl.zst file.
+
+    Yields:
+        Message dictionaries.
+    """
+    with open_message_file(file_path) as raw:
+        for line_number, line in enumerate(raw, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json_loads(line)
+            except ValueError as e:
+                logging.warning(f"Skipping invalid line {line_number} in {file_path}: {e}")
+
+
+# Strings (skipped whole, so brackets inside them don't count), brackets, or
+# the opening quote of a string that continues past the end of the buffer
+ARRAY_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]|"')
+
+# Likely end of a flat element: a closing brace followed by the separator
+ELEMENT_END = re.compile(r"\}\s*[,\]]")
+
+
+def _element_end(buffer: str, start: int) -> Optional[int]:
+    """
+    Find where the JSON object or array starting at buffer[start] ends.
+
+    Returns:
+        Index just past the element, or None if the buffer ends first.
+    """
+    depth = 0
+    for token in ARRAY_TOKEN.finditer(buffer, start):
+        text = token.group()
+        if text == '"':
+            return None
+        if text in "[{":
+            depth += 1
+        elif text in "]}":
+            depth -= 1
+            if depth == 0:
+                return token.end()
+    return None
+
+
+def iter_json_array_messages(file_path: str, read_size: int = 1024 * 1024) -> Iterator[Dict[str, Any]]:
+    """
+    Yield messages from a legacy JSON array file without loading it whole.
+
+    The file is read in read_size blocks and decoded one element at a time
+    (with orjson when installed), so memory is bounded by the block and
+    message size rather than by the file size. Messages are flat objects, so
+    the first closing brace before a separator usually ends the element; a
+    slice only decodes if it is the whole element. Otherwise the bracket scan
+    finds the end, and a malformed element fails as soon as it has been read.
+
+    Args:
+        file_path: Path to the .json file.
+        read_size: Characters read per block.
+
+    Yields:
+        Message dictionaries.
+
+    Raises:
+        ValueError: If the file is not a well-formed JSON array of objects.
+    """
+    buffer = ""
+    position = 0
+    started = False
+    eof = False
+    element = 0
+
+    with open(file_path, "r", encoding="utf-8") as f:
+        while True:
+            # Skip whitespace and separators, reading more input as needed
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position == len(buffer):
+                if eof:
+                    raise ValueError(f"Unterminated JSON array in {file_path}")
+                block = f.read(read_size)
+                eof = not block
+                buffer, position = block, 0
+                continue
+
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError(f"Expected a JSON array in {file_path}")
+                started = True
+                position += 1
+                continue
+
+            if buffer[position] == "]":
+                return
+            if buffer[position] != "{":
+                raise ValueError(f"Expected a JSON object at element {element} of {file_path}")
+
+            candidate = ELEMENT_END.search(buffer, position)
+            if candidate:
+                try:
+                    message = json_loads(buffer[position:candidate.start() + 1])
+                except ValueError:
+                    pass
+                else:
+                    position = candidate.start() + 1
+                    element += 1
+                    yield message
+                    continue
+
+            end = _element_end(buffer, position)
+            if end is None:
+                # Element is split across blocks; read more and retry
+                if eof:
+                    raise ValueError(f"Unterminated element {element} in {file_path}")
+                block = f.read(read_size)
+                eof = not block
+                buffer, position = buffer[position:] + block, 0
+                continue
+
+            try:
+                message = json_loads(buffer[position:end])
+            except ValueError as e:
+                raise ValueError(f"Invalid element {element} in {file_path}: {e}") from e
+            position = end
+            element += 1
+            yield message
+
+
+def iter_messages(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield messages from any data lake message file.
+
+    Args:
+        file_path: Path to a legacy .json array or a JSONL part file.
+
+    Yields:
+        Message dictionaries.
+    """
+    if str(file_path).endswith(".json"):
+        return iter_json_array_messages(file_path)
+    return iter_jsonl_messages(file_path)
+
+
+def iter_message_chunks(file_path: str, chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield messages from a data lake file in lists of at most chunk_size.
+
+    Args:
+        file_path: Path to a legacy .json array or a JSONL part file.
+        chunk_size: Maximum messages per chunk.
+
+    Yields:
+        Lists of message dictionaries.
+    """
+    chunk = []
+    for message in iter_messages(file_path):
+        chunk.append(message)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class JsonlPartWriter:
+    """
+    Append-only, size-rotated JSON Lines writer for one channel.
+
+    Each flush appends a chunk of records to the current part file and
+    closes it again, so a crash never loses more than the unflushed buffer.
+    Compressed parts are written as one gzip member or zstd frame per flush,
+    which standard readers decode as a single stream.
+    """
+
+    def __init__(
+        self,
+        channel_name: str,
+        flush_every: Optional[int] = None,
+        rotate_bytes: Optional[int] = None,
+        compression: Optional[str] = None,
+        base_path: Optional[Path] = None
+    ):
+        """
+        Args:
+            channel_name: Name of the channel being written.
+            flush_every: Records buffered before a flush.
+                Defaults to ScraperConfig.WRITER_FLUSH_EVERY.
+            rotate_bytes: Part size that triggers a new part file.
+                Defaults to ScraperConfig.WRITER_ROTATE_BYTES.
+            compression: "none", "gzip" or "zstd".
+                Defaults to ScraperConfig.WRITER_COMPRESSION.
+            base_path: Root of the message data lake.
+                Defaults to DataPathsConfig.MESSAGE_PATH.
+        """
+        self.channel_name = channel_name
+        self.flush_every = max(1, flush_every or ScraperConfig.WRITER_FLUSH_EVERY)
+        self.rotate_bytes = rotate_bytes or ScraperConfig.WRITER_ROTATE_BYTES
+        self.compression = compression or ScraperConfig.WRITER_COMPRESSION
+
+        if self.compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Unsupported compression: {self.compression}")
+        if self.compression == "zstd" and zstandard is None:
+            raise RuntimeError("zstandard is required for zstd compression")
+
+        now = datetime.now()
+        self.output_dir = (base_path or DataPathsConfig.MESSAGE_PATH) / now.strftime("%Y-%m-%d") / channel_name
+        self.run_id = now.strftime("%H%M%S%f")
+        self.part_number = 0
+        self.records_written = 0
+        self.buffer: List[Dict[str, Any]] = []
+
+    @property
+    def current_part(self) -> Path:
+        """Path of the part file currently being appended to."""
+        extension = COMPRESSION_EXTENSIONS[self.compression]
+        return self.output_dir / f"part-{self.run_id}-{self.part_number:05d}.jsonl{extension}"
+
+    @property
+    def is_full(self) -> bool:
+        """Whether the buffer has reached flush_every records."""
+        return len(self.buffer) >= self.flush_every
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """
+        Buffer a record.
+
+        Records are only written on flush(), so callers can finish work on
+        them (such as photo downloads) before they reach disk.
+        """
+        self.buffer.append(record)
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """
+        Append buffered records to the current part file.
+
+        Returns:
+            The records that were written.
+        """
+        if not self.buffer:
+            return []
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        payload = "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in self.buffer
+        ).encode("utf-8")
+
+        part = self.current_part
+        if self.compression == "gzip":
+            payload = gzip.compress(payload)
+        elif self.compression == "zstd":
+            payload = zstandard.ZstdCompressor().compress(payload)
+
+        with open(part, "ab") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.records_written += len(self.buffer)
+        logging.debug(f"Flushed {len(self.buffer)} messages for {self.channel_name} to {part}")
+        flushed, self.buffer = self.buffer, []
+
+        if part.stat().st_size >= self.rotate_bytes:
+            self.part_number += 1
+
+        return flushed
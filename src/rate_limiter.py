@@ -0,0 +1,219 @@
+"""
+FloodWait-aware rate limiting for Telegram API calls.
+
+All channels share one token bucket whose refill rate adapts to the API:
+it creeps up after successful calls and is cut back whenever Telegram answers
+with a FloodWait, while the channel that was throttled pauses for the hinted
+number of seconds and then resumes where it stopped.
+"""
+import time
+import asyncio
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Any, Optional, AsyncIterator
+
+from telethon import TelegramClient
+from telethon.errors import FloodWaitError
+
+from config import ScraperConfig
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket shared by all Telegram calls, adapting to FloodWait hints.
+
+    The rate grows additively after each successful call, up to max_rate, and
+    shrinks multiplicatively once per FloodWait episode, down to min_rate.
+    """
+
+    def __init__(
+        self,
+        max_rate: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        burst: Optional[int] = None
+    ):
+        """
+        Args:
+            max_rate: Highest calls per second. Defaults to ScraperConfig.RATE_LIMIT_MAX_RATE.
+            min_rate: Lowest calls per second. Defaults to ScraperConfig.RATE_LIMIT_MIN_RATE.
+            burst: Bucket capacity. Defaults to ScraperConfig.RATE_LIMIT_BURST.
+        """
+        self.max_rate = max_rate or ScraperConfig.RATE_LIMIT_MAX_RATE
+        self.min_rate = min_rate or ScraperConfig.RATE_LIMIT_MIN_RATE
+        self.burst = burst or ScraperConfig.RATE_LIMIT_BURST
+        self.rate = self.max_rate
+
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._resume_at: Dict[str, float] = {}
+        self._cut_cooldown_until = 0.0
+
+        self.requests = 0
+        self.flood_waits = 0
+        self.throttled_seconds = 0.0
+        self.flood_wait_seconds: Dict[str, float] = defaultdict(float)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, key: str) -> None:
+        """
+        Wait until a call for the given channel may be made.
+
+        Args:
+            key: Channel name the call is made for.
+        """
+        start = time.monotonic()
+
+        # Honour any FloodWait pause on this channel first
+        resume_at = self._resume_at.get(key, 0.0)
+        if resume_at > start:
+            await asyncio.sleep(resume_at - start)
+
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+        self.requests += 1
+        self.throttled_seconds += time.monotonic() - start
+
+    def record_success(self) -> None:
+        """Raise the rate after a call completed without a FloodWait."""
+        self.rate = min(self.max_rate, self.rate + ScraperConfig.RATE_LIMIT_INCREASE)
+
+    def record_flood_wait(self, key: str, seconds: float) -> None:
+        """
+        Pause a channel for the hinted time and cut the shared rate.
+
+        Args:
+            key: Channel name the FloodWait was raised for.
+            seconds: Wait time requested by Telegram.
+        """
+        now = time.monotonic()
+        self.flood_waits += 1
+        self.flood_wait_seconds[key] += seconds
+        self._resume_at[key] = max(self._resume_at.get(key, 0.0), now + seconds)
+
+        # Calls already in flight fail together; cut the rate once per episode
+        if now >= self._cut_cooldown_until:
+            self.rate = max(self.min_rate, self.rate * ScraperConfig.RATE_LIMIT_DECREASE_FACTOR)
+            self._cut_cooldown_until = now + seconds
+        # Drop accumulated burst so other channels don't pile in right away
+        self._tokens = min(self._tokens, 0.0)
+        logging.warning(
+            f"FloodWait of {seconds}s on {key}; rate lowered to {self.rate:.2f} calls/s"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get limiter counters for the run.
+
+        Returns:
+            Dictionary with request, FloodWait and throttling statistics.
+        """
+        return {
+            "requests": self.requests,
+            "flood_waits": self.flood_waits,
+            "flood_wait_seconds": dict(self.flood_wait_seconds),
+            "throttled_seconds": round(self.throttled_seconds, 2),
+            "current_rate": round(self.rate, 2),
+        }
+
+
+async def iter_messages_limited(
+    client: TelegramClient,
+    limiter: AdaptiveRateLimiter,
+    channel_name: str,
+    limit: Optional[int] = None,
+    min_id: int = 0,
+    offset_id: int = 0,
+    reverse: bool = False
+) -> AsyncIterator:
+    """
+    Rate-limited client.iter_messages that survives FloodWait errors.
+
+    History is fetched one API page at a time, taking a token per page. On a
+    FloodWait the channel backs off and iteration resumes after the last
+    message already yielded, so nothing is lost or repeated.
+
+    Args:
+        client: TelegramClient instance for API access.
+        limiter: Shared rate limiter.
+        channel_name: Name of the channel to read.
+        limit: Maximum number of messages, or None for all.
+        min_id: Only return messages with a greater id.
+        offset_id: Only return messages older than this id (newer if reverse).
+        reverse: Return messages oldest first.
+
+    Yields:
+        Telethon message objects.
+    """
+    page_size = ScraperConfig.RATE_LIMIT_PAGE_SIZE
+    remaining = limit
+
+    while remaining is None or remaining > 0:
+        request_size = page_size if remaining is None else min(page_size, remaining)
+        await limiter.acquire(channel_name)
+
+        received = 0
+        try:
+            async for message in client.iter_messages(
+                channel_name,
+                limit=request_size,
+                min_id=min_id,
+                offset_id=offset_id,
+                reverse=reverse
+            ):
+                received += 1
+                # Move the cursor so a retry continues after this message
+                if reverse:
+                    min_id = message.id
+                else:
+                    offset_id = message.id
+                yield message
+        except FloodWaitError as e:
+            limiter.record_flood_wait(channel_name, e.seconds)
+            if remaining is not None:
+                remaining -= received
+            continue
+
+        limiter.record_success()
+        if remaining is not None:
+            remaining -= received
+        if received < request_size:
+            break
+
+
+async def download_media_limited(
+    client: TelegramClient,
+    limiter: AdaptiveRateLimiter,
+    channel_name: str,
+    media,
+    image_file: Path
+) -> None:
+    """
+    Rate-limited client.download_media that retries after FloodWait errors.
+
+    Args:
+        client: TelegramClient instance for API access.
+        limiter: Shared rate limiter.
+        channel_name: Name of the channel the media belongs to.
+        media: Telethon media object.
+        image_file: Target path of the download.
+    """
+    while True:
+        await limiter.acquire(channel_name)
+        try:
+            await client.download_media(media, image_file)
+        except FloodWaitError as e:
+            limiter.record_flood_wait(channel_name, e.seconds)
+            continue
+        limiter.record_success()
+        return
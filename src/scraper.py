@@ -1,12 +1,19 @@
-import json
+import time
+import asyncio
 import logging
+import argparse
 from datetime import datetime
+from pathlib import Path
 from typing import List, Dict, Any, Optional
 
 from telethon import TelegramClient
 from telethon.tl.types import MessageMediaPhoto
 
-from config import TelegramConfig, ChannelConfig, DataPathsConfig
+from config import TelegramConfig, ChannelConfig, DataPathsConfig, ScraperConfig
+from checkpoints import load_checkpoint, save_checkpoint, advance_checkpoint
+from media_downloads import MediaDownloadPool
+from message_files import JsonlPartWriter
+from rate_limiter import AdaptiveRateLimiter, iter_messages_limited
 
 # Configure logging
 LOG_FILE = f"logs/scraper_{datetime.now().strftime('%Y_%m_%d')}.log"
@@ -20,85 +27,349 @@ logging.basicConfig(
     ]
 )
 
-# Helper function to save JSON messages
+# Helper functions for streaming messages to the data lake
 
-def save_messages(messages: List[Dict[str, Any]], channel_name: str) -> None:
+async def flush_messages(
+    writer: JsonlPartWriter,
+    downloads: MediaDownloadPool,
+    checkpoint: Dict[str, Any],
+    channel_name: str
+) -> int:
     """
-    Save messages to a JSON file in the data lake directory structure.
+    Write buffered messages to the data lake and advance the checkpoint.
+    
+    Pending photo downloads are finished first so every written record has
+    its image_path, and the checkpoint only ever covers messages on disk.
     
     Args:
-        messages: List of message dictionaries to save.
+        writer: JSONL writer holding the buffered messages.
+        downloads: Download pool fetching the messages' photos.
+        checkpoint: Channel checkpoint, advanced past the flushed messages.
         channel_name: Name of the channel being scraped.
+        
+    Returns:
+        Number of messages written.
     """
-    today = datetime.now().strftime("%Y-%m-%d")
-    output_dir = DataPathsConfig.MESSAGE_PATH / today
-    output_dir.mkdir(parents = True, exist_ok = True)
-
-    file_path = output_dir / f"{channel_name}.json"
+    await downloads.drain()
+    flushed = writer.flush()
+    if flushed:
+        advance_checkpoint(checkpoint, flushed)
+        save_checkpoint(channel_name, checkpoint)
+    return len(flushed)
 
-    with open(file_path, "w", encoding = "utf-8") as f:
-        json.dump(messages, f, ensure_ascii = False, indent = 2)
 
-    logging.info(f"Saved {len(messages)} messages for {channel_name}")
+def log_download_stats(channel_name: str, downloads: MediaDownloadPool) -> None:
+    """Log how many photos of a channel were downloaded, skipped or failed."""
+    logging.info(
+        f"Images for {channel_name}: {downloads.downloaded} downloaded, "
+        f"{downloads.skipped} already present, {downloads.failed} failed"
+    )
 
 # Main scraping function
 
-async def scrape_channel(client: TelegramClient, channel_name: str) -> None:
+def build_message_record(message, channel_name: str) -> Dict[str, Any]:
     """
-    Scrape messages from a Telegram channel and save them to the data lake.
+    Convert a Telegram message into a data lake record.
+    
+    The image_path is left empty; it is filled in by the download pool once
+    the message's photo is on disk.
+    
+    Args:
+        message: Telethon message object.
+        channel_name: Name of the channel the message belongs to.
+        
+    Returns:
+        Message dictionary ready to be saved.
+    """
+    return {
+        "message_id" :message.id,
+        "channel_name" : channel_name,
+        "message_date" : message.date.isoformat() if message.date else None,
+        "message_text" : message.text,
+        "views" : message.views,
+        "forwards" : message.forwards,
+        "has_media" : message.media is not None,
+        "image_path" : None
+
+    }
+
+
+async def stream_messages(
+    messages,
+    channel_name: str,
+    channel_image_dir: Path,
+    downloads: MediaDownloadPool,
+    writer: JsonlPartWriter,
+    checkpoint: Dict[str, Any]
+) -> int:
+    """
+    Stream messages into the data lake in chunks, handing photos to the download pool.
+    
+    Iteration only blocks when the download queue is full. Every
+    ScraperConfig.WRITER_FLUSH_EVERY messages the chunk is flushed and the
+    checkpoint advanced, so memory stays flat and a crash mid-channel keeps
+    everything flushed so far.
+    
+    Args:
+        messages: Async iterator of Telethon messages.
+        channel_name: Name of the channel being scraped.
+        channel_image_dir: Directory where the channel's images are stored.
+        downloads: Download pool that fetches photos in the background.
+        writer: JSONL writer for the channel.
+        checkpoint: Channel checkpoint, advanced after every flush.
+        
+    Returns:
+        Number of messages scraped.
+    """
+    count = 0
+
+    async for message in messages:
+        msg = build_message_record(message, channel_name)
+
+        # Queue image download if exists
+        if isinstance(message.media, MessageMediaPhoto):
+            image_file = channel_image_dir / f"{message.id}.jpg"
+            await downloads.submit(message.media, msg, image_file)
+
+        writer.write(msg)
+        count += 1
+
+        if writer.is_full:
+            await flush_messages(writer, downloads, checkpoint, channel_name)
+
+    await flush_messages(writer, downloads, checkpoint, channel_name)
+    return count
+
+
+async def scrape_channel(
+    client: TelegramClient,
+    channel_name: str,
+    limiter: Optional[AdaptiveRateLimiter] = None
+) -> int:
+    """
+    Scrape new messages from a Telegram channel and save them to the data lake.
+    
+    Only messages newer than the channel's checkpoint are fetched. A channel
+    without a checkpoint gets its most recent ScraperConfig.INITIAL_SCRAPE_LIMIT
+    messages; older history is left to backfill_channel.
     
     Args:
         client: TelegramClient instance for API access.
         channel_name: Name of the channel to scrape.
+        limiter: Rate limiter shared across channels. A private one is
+            created if not given.
+        
+    Returns:
+        Number of messages scraped from the channel.
     """
     logging.info(f"Scraping channel: {channel_name}")
-    messages_data = []
+    limiter = limiter or AdaptiveRateLimiter()
 
     channel_image_dir = DataPathsConfig.IMAGE_PATH / channel_name
     channel_image_dir.mkdir(parents  =True, exist_ok = True)
 
-    async for message in client.iter_messages(channel_name, limit = 1000):
-        msg = {
-            "message_id" :message.id,
-            "channel_name" : channel_name,
-            "message_date" : message.date.isoformat() if message.date else None,
-            "message_text" : message.text,
-            "views" : message.views,
-            "forwards" : message.forwards,
-            "has_media" : message.media is not None,
-            "image_path" : None
+    checkpoint = load_checkpoint(channel_name)
+    last_message_id = checkpoint.get("last_message_id")
 
-        }
+    if last_message_id:
+        logging.info(f"Fetching {channel_name} messages newer than {last_message_id}")
+        messages = iter_messages_limited(
+            client, limiter, channel_name, min_id = last_message_id, reverse = True
+        )
+    else:
+        messages = iter_messages_limited(
+            client, limiter, channel_name, limit = ScraperConfig.INITIAL_SCRAPE_LIMIT
+        )
 
-        # Download image if exists
-        if isinstance(message.media, MessageMediaPhoto):
-            image_file = channel_image_dir / f"{message.id}.jpg"
-            await client.download_media(message.media, image_file)
-            msg["image_path"] = str(image_file)
+    writer = JsonlPartWriter(channel_name)
+    async with MediaDownloadPool(client, channel_name, limiter) as downloads:
+        count = await stream_messages(
+            messages, channel_name, channel_image_dir, downloads, writer, checkpoint
+        )
+    log_download_stats(channel_name, downloads)
+
+    if not count:
+        logging.info(f"No new messages for {channel_name}")
+    else:
+        logging.info(f"Saved {writer.records_written} messages for {channel_name}")
+    return count
 
-        messages_data.append(msg)
 
-    save_messages(messages_data, channel_name)
+async def backfill_channel(
+    client: TelegramClient,
+    channel_name: str,
+    chunk_size: Optional[int] = None,
+    max_chunks: Optional[int] = None,
+    limiter: Optional[AdaptiveRateLimiter] = None
+) -> int:
+    """
+    Page backwards through a channel's history in bounded chunks.
+    
+    Messages are streamed to the data lake and the checkpoint advanced as
+    they are flushed, so an interrupted backfill resumes from the last flush.
+    
+    Args:
+        client: TelegramClient instance for API access.
+        channel_name: Name of the channel to backfill.
+        chunk_size: Messages per chunk. Defaults to ScraperConfig.BACKFILL_CHUNK_SIZE.
+        max_chunks: Chunks fetched in this run. Defaults to ScraperConfig.BACKFILL_MAX_CHUNKS.
+        limiter: Rate limiter shared across channels. A private one is
+            created if not given.
+        
+    Returns:
+        Number of messages scraped from the channel.
+    """
+    chunk_size = chunk_size or ScraperConfig.BACKFILL_CHUNK_SIZE
+    max_chunks = max_chunks or ScraperConfig.BACKFILL_MAX_CHUNKS
+    limiter = limiter or AdaptiveRateLimiter()
+
+    checkpoint = load_checkpoint(channel_name)
+    if checkpoint.get("backfill_complete"):
+        logging.info(f"Backfill already complete for {channel_name}")
+        return 0
+
+    channel_image_dir = DataPathsConfig.IMAGE_PATH / channel_name
+    channel_image_dir.mkdir(parents = True, exist_ok = True)
+
+    total = 0
+    writer = JsonlPartWriter(channel_name)
+    async with MediaDownloadPool(client, channel_name, limiter) as downloads:
+        for _ in range(max_chunks):
+            # offset_id=0 starts from the newest message
+            offset_id = checkpoint.get("backfill_offset_id") or 0
+            logging.info(f"Backfilling {channel_name} before message {offset_id or 'latest'}")
+
+            messages = iter_messages_limited(
+                client, limiter, channel_name, offset_id = offset_id, limit = chunk_size
+            )
+            count = await stream_messages(
+                messages, channel_name, channel_image_dir, downloads, writer, checkpoint
+            )
+
+            if not count:
+                checkpoint["backfill_complete"] = True
+                save_checkpoint(channel_name, checkpoint)
+                logging.info(f"Backfill reached the start of {channel_name}")
+                break
+
+            total += count
+    log_download_stats(channel_name, downloads)
+
+    return total
+
+
+async def scrape_channel_limited(
+    client: TelegramClient,
+    channel_name: str,
+    semaphore: asyncio.Semaphore,
+    limiter: AdaptiveRateLimiter,
+    backfill: bool = False
+) -> Optional[int]:
+    """
+    Scrape a single channel under a concurrency limit, isolating failures.
+    
+    Args:
+        client: TelegramClient instance shared by all channels.
+        channel_name: Name of the channel to scrape.
+        semaphore: Semaphore bounding the number of channels scraped at once.
+        limiter: Rate limiter shared by all channels.
+        backfill: Page through older history instead of fetching new messages.
+        
+    Returns:
+        Number of messages scraped, or None if the channel failed.
+    """
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            if backfill:
+                count = await backfill_channel(client, channel_name, limiter = limiter)
+            else:
+                count = await scrape_channel(client, channel_name, limiter)
+        except Exception as e:
+            logging.error(f"Failed to scrape {channel_name} : {e}")
+            return None
+        elapsed = time.perf_counter() - start
+        logging.info(
+            f"Scraped {count} messages from {channel_name} in {elapsed:.2f}s"
+        )
+        return count
 
 
 # Main entry point
 
-async def main() -> None:
+async def main(
+    concurrency: Optional[int] = None,
+    backfill: bool = False,
+    channels: Optional[List[str]] = None,
+    client: Optional[TelegramClient] = None
+) -> int:
     """
     Main entry point for the Telegram scraper.
     
-    Iterates through configured channels and scrapes their messages.
+    Scrapes the configured channels concurrently under one TelegramClient.
+    A failure in one channel is logged and does not affect the others.
+    
+    Args:
+        concurrency: Maximum number of channels scraped in parallel.
+            Defaults to ScraperConfig.MAX_CONCURRENT_CHANNELS; 1 scrapes
+            channels sequentially.
+        backfill: Run the resumable history backfill instead of an
+            incremental scrape.
+        channels: Channels to scrape. Defaults to ChannelConfig.CHANNELS.
+        client: Client to scrape with, such as an offline stand-in for
+            benchmarks. Defaults to a TelegramClient on the local session.
+            
+    Returns:
+        Total number of messages scraped.
     """
-    # Validate Telegram API credentials only when actually running
-    TelegramConfig.validate()
+    if client is None:
+        # Validate Telegram API credentials only when actually running
+        TelegramConfig.validate()
+        client = TelegramClient("telegram_session", TelegramConfig.API_ID, TelegramConfig.API_HASH)
+    
+    concurrency = max(1, concurrency or ScraperConfig.MAX_CONCURRENT_CHANNELS)
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = AdaptiveRateLimiter()
+    channels = channels or ChannelConfig.CHANNELS
+    
+    mode = "backfill" if backfill else "incremental"
+    logging.info(f"Scraping {len(channels)} channels ({mode}) with concurrency {concurrency}")
+    start = time.perf_counter()
+    
+    async with client:
+        # Surface every FloodWait to the limiter instead of Telethon sleeping on it
+        client.flood_sleep_threshold = 0
+        results = await asyncio.gather(
+            *(scrape_channel_limited(client, channel, semaphore, limiter, backfill) for channel in channels)
+        )
     
-    async with TelegramClient("telegram_session", TelegramConfig.API_ID, TelegramConfig.API_HASH) as client:
-        for channel in ChannelConfig.CHANNELS:
-            try: 
-                await scrape_channel(client, channel)
-            except Exception as e:
-                logging.error(f"Failed to scrape {channel} : {e}")
+    elapsed = time.perf_counter() - start
+    succeeded = [count for count in results if count is not None]
+    logging.info(
+        f"Scraped {sum(succeeded)} messages from {len(succeeded)}/{len(channels)} "
+        f"channels in {elapsed:.2f}s"
+    )
+    logging.info(f"Rate limiter stats: {limiter.stats()}")
+    return sum(succeeded)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments for the scraper."""
+    parser = argparse.ArgumentParser(description="Scrape Telegram channels into the data lake")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Maximum number of channels scraped in parallel"
+    )
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Page through older channel history in resumable chunks"
+    )
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    import asyncio
-    asyncio.run(main())
\ No newline at end of file
+    args = parse_args()
+    asyncio.run(main(concurrency=args.concurrency, backfill=args.backfill))
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""
+Bump the warehouse version marker after a successful dbt run.
+
+The API keys its response cache on this version, so bumping it makes every
+cached report stale as soon as the freshly built marts are in place.
+
+Usage:
+    python src/warehouse_version.py
+"""
+import logging
+
+import psycopg2
+
+from config import DatabaseConfig, DatabaseSchemaConfig
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[
+        logging.StreamHandler()
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+
+def bump_warehouse_version() -> int:
+    """
+    Increment the warehouse version, creating the marker table if needed.
+
+    Returns:
+        The new version number.
+    """
+    conn = psycopg2.connect(**DatabaseConfig.get_connection_params())
+    try:
+        with conn, conn.cursor() as cursor:
+            cursor.execute(DatabaseSchemaConfig.CREATE_SCHEMA_QUERY)
+            cursor.execute(DatabaseSchemaConfig.CREATE_WAREHOUSE_VERSION_TABLE_QUERY)
+            cursor.execute(DatabaseSchemaConfig.BUMP_WAREHOUSE_VERSION_QUERY)
+            version = cursor.fetchone()[0]
+    finally:
+        conn.close()
+
+    logger.info(f"Warehouse version bumped to {version}")
+    return version
+
+
+if __name__ == "__main__":
+    bump_warehouse_version()
@@ -1,8 +1,24 @@
 # src/yolo_detect.py
 
+import os
 import csv
+import time
+import argparse
+import multiprocessing
+import psycopg2
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
-from ultralytics import YOLO
+from ultralytics import YOLO, __version__ as ultralytics_version
+from ultralytics.data.augment import LetterBox
+from ultralytics.utils import ops
+from ultralytics.utils.patches import imread
+
+from config import DatabaseConfig, YoloConfig
+from detection_cache import DetectionCache
+from image_dedup import PerceptualHashIndex, group_near_duplicates, dedup_stats
+from load_yolo_to_postgres import YoloBoxLoader
 
 # =========================
 # Configuration
@@ -20,6 +36,10 @@ MODEL_NAME = "yolov8n.pt"
 # Supported image formats
 IMAGE_EXTENSIONS = ("*.jpg", "*.jpeg", "*.png", "*.JPG", "*.PNG")
 
+# Objects that decide an image's category ("container" is not a COCO class)
+PERSON_OBJECTS = {"person"}
+PRODUCT_OBJECTS = {"bottle", "cup", "container"}
+
 # =========================
 # YOLO Model (lazy loaded)
 # =========================
@@ -33,6 +53,17 @@ def get_model():
         _model = YOLO(MODEL_NAME)
     return _model
 
+
+def model_key(fast: bool = False) -> str:
+    """Identify the model and settings detections are produced with."""
+    key = f"{MODEL_NAME}|ultralytics-{ultralytics_version}|imgsz={YoloConfig.IMAGE_SIZE}"
+    if fast:
+        key += (
+            f"|fast={YoloConfig.FAST_IMAGE_SIZE},{YoloConfig.FAST_ESCALATE_CONFIDENCE},"
+            f"{YoloConfig.FAST_ESCALATE_EMPTY}"
+        )
+    return key
+
 # =========================
 # Helper Functions
 # =========================
@@ -47,8 +78,8 @@ def classify_image(objects: set) -> str:
     Returns:
         str: Image category
     """
-    has_person = "person" in objects
-    has_product = bool(objects.intersection({"bottle", "cup", "container"}))
+    has_person = bool(objects.intersection(PERSON_OBJECTS))
+    has_product = bool(objects.intersection(PRODUCT_OBJECTS))
 
     if has_person and has_product:
         return "promotional"
@@ -60,70 +91,772 @@ def classify_image(objects: set) -> str:
         return "other"
 
 
+def summarize_detections(image_path: Path, detections, names) -> list:
+    """
+    Reduce one YOLO result to the image-level output row.
+
+    Args:
+        image_path (Path): Image the result belongs to
+        detections: Ultralytics Results object for the image
+        names (dict): Class index to class name mapping
+
+    Returns:
+        list: [image_name, detected_objects, image_category, confidence_score]
+    """
+    detected_objects = set()
+    confidence_scores = []
+
+    if detections.boxes is not None:
+        # Pull classes and confidences out of the tensors in one go
+        for class_id, confidence in zip(
+            detections.boxes.cls.tolist(), detections.boxes.conf.tolist()
+        ):
+            detected_objects.add(names[int(class_id)])
+            confidence_scores.append(confidence)
+
+    image_category = classify_image(detected_objects)
+
+    avg_confidence = round(
+        sum(confidence_scores) / len(confidence_scores), 3
+    ) if confidence_scores else 0.0
+
+    return [
+        image_path.name,
+        ",".join(sorted(detected_objects)),
+        image_category,
+        avg_confidence
+    ]
+
+
+def extract_boxes(detections, names) -> list:
+    """
+    List every detected box of one YOLO result.
+
+    Args:
+        detections: Ultralytics Results object for the image
+        names (dict): Class index to class name mapping
+
+    Returns:
+        list: (box_index, class_id, class_name, confidence, x1, y1, x2, y2)
+            tuples, with pixel coordinates in the original image
+    """
+    if detections.boxes is None:
+        return []
+
+    boxes = detections.boxes
+    return [
+        (box_index, int(class_id), names[int(class_id)], confidence, *xyxy)
+        for box_index, (class_id, confidence, xyxy) in enumerate(
+            zip(boxes.cls.tolist(), boxes.conf.tolist(), boxes.xyxy.tolist())
+        )
+    ]
+
+
+def collect_image_paths() -> list:
+    """
+    Collect all images under IMAGE_DIR recursively.
+
+    Returns:
+        list: Image paths
+    """
+    image_paths = []
+    for ext in IMAGE_EXTENSIONS:
+        image_paths.extend(IMAGE_DIR.rglob(ext))
+    return image_paths
+
+
 # =========================
-# Core Detection Logic
+# Batched Inference
 # =========================
 
-def run_detection():
+def load_image(image_path: Path, letterbox: LetterBox):
     """
-    Run YOLOv8 object detection on all images in the data lake.
+    Decode and letterbox one image the way single-image prediction would.
+
+    Args:
+        image_path (Path): Image to load
+        letterbox (LetterBox): Resizer matching the predictor's own
 
     Returns:
-        list: Detection results
+        tuple: ((height, width) of the original image, letterboxed image),
+            or None if unreadable
     """
-    results_data = []
+    image = imread(str(image_path))
+    if image is None:
+        return None
+    # Only the original shape is kept; it is all scale_boxes needs
+    return image.shape[:2], letterbox(image=image)
+
+
+def iter_image_batches(
+    image_paths: list,
+    model,
+    batch_size: int,
+    workers: int,
+    imgsz: int,
+    max_buffered: int = None
+):
+    """
+    Decode upcoming images on a thread pool and group them into batches.
+
+    Images are letterboxed with minimal padding, exactly as a one-image call
+    would, and only images with the same letterboxed shape share a batch, so
+    every image reaches the network as the same tensor it would alone.
+
+    Memory is bounded: at most 2 x batch_size images are being decoded, and
+    at most max_buffered letterboxed images wait for their shape's batch to
+    fill. At that cap the fullest shape is sent as a short batch. Original
+    images are dropped once letterboxed; only their shapes are kept.
+
+    Args:
+        image_paths (list): Images to load
+        model: YOLO model the batches are for
+        batch_size (int): Images per batch
+        workers (int): Decoding threads
+        imgsz (int): Inference input size
+        max_buffered (int): Images waiting across all shapes. Defaults to
+            YoloConfig.MAX_BUFFERED_IMAGES, or 4 batches if 0.
+
+    Yields:
+        list: Batch of (position, image_path, original (height, width),
+            letterboxed image) tuples
+    """
+    max_buffered = max_buffered or YoloConfig.MAX_BUFFERED_IMAGES or 4 * batch_size
+    max_buffered = max(max_buffered, batch_size)
+    stride = max(int(model.model.stride.max()), 32)
+    letterbox = LetterBox(new_shape=(imgsz, imgsz), auto=True, stride=stride)
+    buckets = {}
+    buffered = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Keep a bounded number of decoded images in flight
+        pending = deque()
+        paths = iter(enumerate(image_paths))
+
+        def submit_next():
+            item = next(paths, None)
+            if item is not None:
+                position, image_path = item
+                pending.append((position, image_path, executor.submit(load_image, image_path, letterbox)))
+
+        for _ in range(batch_size * 2):
+            submit_next()
+
+        while pending:
+            position, image_path, future = pending.popleft()
+            submit_next()
+
+            loaded = future.result()
+            if loaded is None:
+                print(f"⚠️ Could not read image, skipping: {image_path}")
+                continue
+
+            original_shape, resized = loaded
+            bucket = buckets.setdefault(resized.shape, [])
+            bucket.append((position, image_path, original_shape, resized))
+            buffered += 1
+
+            if len(bucket) >= batch_size:
+                shape = resized.shape
+            elif buffered >= max_buffered:
+                shape = max(buckets, key=lambda key: len(buckets[key]))
+            else:
+                continue
+            batch = buckets.pop(shape)
+            buffered -= len(batch)
+            yield batch
+
+    for bucket in buckets.values():
+        yield bucket
+
+
+def restore_original_scale(result, original_shape, resized):
+    """
+    Map a result predicted on a letterboxed image back to the original image.
+
+    The predictor only knows the letterboxed array it was given, so its boxes
+    are in letterbox pixels. They are rescaled and clipped the way a
+    single-image call does it, and the original shape set on the result.
+    orig_img stays the letterboxed image, since the original isn't kept.
+
+    Args:
+        result: Ultralytics Results predicted on the letterboxed image
+        original_shape (tuple): (height, width) of the original image
+        resized: Letterboxed image the model was run on
+
+    Returns:
+        Ultralytics Results in original image pixels
+    """
+    result.orig_shape = original_shape
+    if result.boxes is not None:
+        data = result.boxes.data.clone()
+        ops.scale_boxes(resized.shape[:2], data[:, :4], original_shape)
+        result.update(boxes=data)
+    return result
+
+
+def predict_images(
+    image_paths: list,
+    model,
+    batch_size: int,
+    workers: int,
+    imgsz: int = None,
+    classes: list = None
+):
+    """
+    Run the model over images, batched or one image per call.
+
+    Results are yielded as soon as they are ready, which in batched mode is
+    not input order; use the position to restore it.
+
+    Args:
+        image_paths (list): Images to run detection on
+        model: Loaded YOLO model
+        batch_size (int): Images per inference call; 1 runs one call per image
+        workers (int): Decoding threads in batched mode
+        imgsz (int): Inference input size. Defaults to YoloConfig.IMAGE_SIZE.
+        classes (list): Class ids to keep, or None for all classes
+
+    Yields:
+        tuple: (position, image_path, Ultralytics Results)
+    """
+    imgsz = imgsz or YoloConfig.IMAGE_SIZE
+
+    if batch_size <= 1:
+        for position, image_path in enumerate(image_paths):
+            detections = model(image_path, imgsz=imgsz, classes=classes, verbose=False)[0]
+            yield position, image_path, detections
+        return
+
+    for batch in iter_image_batches(image_paths, model, batch_size, workers, imgsz):
+        detections = model(
+            [resized for _, _, _, resized in batch],
+            imgsz=imgsz,
+            classes=classes,
+            verbose=False
+        )
+        for (position, image_path, original_shape, resized), result in zip(batch, detections):
+            yield position, image_path, restore_original_scale(result, original_shape, resized)
+
+
+def detect_images_local(
+    image_paths: list,
+    batch_size: int,
+    prefetch_workers: int,
+    fast: bool = False
+) -> list:
+    """
+    Run detection in this process, batched or one image at a time.
+
+    Args:
+        image_paths (list): Images to run detection on
+        batch_size (int): Images per inference call; 1 runs one call per image
+        prefetch_workers (int): Decoding threads in batched mode
+        fast (bool): Use the fast categorization mode
+
+    Returns:
+        list: (image_path, result row) pairs in image_paths order
+    """
+    # Load model only when actually needed
+    model = get_model()
+
+    if fast:
+        detected, escalated = categorize_fast(image_paths, model, batch_size, prefetch_workers)
+        print(f"⚡ Fast categorization: {escalated} of {len(detected)} images escalated to a full pass")
+        return detected
+
+    results_by_position = {}
+    for position, image_path, detections in predict_images(
+        image_paths, model, batch_size, prefetch_workers
+    ):
+        results_by_position[position] = (
+            image_path, summarize_detections(image_path, detections, model.names)
+        )
+
+    return [results_by_position[position] for position in sorted(results_by_position)]
+
+
+# =========================
+# Fast Categorization
+# =========================
+
+def category_class_ids(names: dict) -> list:
+    """
+    Get the ids of the classes classify_image looks at.
+
+    Args:
+        names (dict): Class index to class name mapping
+
+    Returns:
+        list: Class ids present in the model (classes it lacks are ignored)
+    """
+    return sorted(
+        class_id for class_id, name in names.items()
+        if name in PERSON_OBJECTS | PRODUCT_OBJECTS
+    )
+
+
+def needs_full_pass(detections) -> bool:
+    """
+    Decide whether a fast-pass result is too uncertain to keep.
+
+    Args:
+        detections: Ultralytics Results from the restricted, low-resolution pass
+
+    Returns:
+        bool: True if the image should be re-run at full resolution
+    """
+    confidences = [] if detections.boxes is None else detections.boxes.conf.tolist()
+    if not confidences:
+        # Small objects are the first thing lost at low resolution
+        return YoloConfig.FAST_ESCALATE_EMPTY
+    return min(confidences) < YoloConfig.FAST_ESCALATE_CONFIDENCE
+
+
+def categorize_fast(image_paths: list, model, batch_size: int, prefetch_workers: int) -> tuple:
+    """
+    Categorize images with a class-restricted, reduced-resolution pass.
+
+    Only the classes classify_image uses are detected, at
+    YoloConfig.FAST_IMAGE_SIZE. Images with no detections or a detection below
+    YoloConfig.FAST_ESCALATE_CONFIDENCE are re-run with the full pass, so
+    their rows are identical to the full mode. Rows kept from the fast pass
+    list only the category classes and average only their confidences.
+
+    Args:
+        image_paths (list): Images to categorize
+        model: Loaded YOLO model
+        batch_size (int): Images per inference call
+        prefetch_workers (int): Decoding threads in batched mode
+
+    Returns:
+        tuple: ((image_path, result row) pairs in image_paths order,
+            number of images escalated)
+    """
+    results_by_position = {}
+    escalate = []
+
+    for position, image_path, detections in predict_images(
+        image_paths,
+        model,
+        batch_size,
+        prefetch_workers,
+        imgsz=YoloConfig.FAST_IMAGE_SIZE,
+        classes=category_class_ids(model.names)
+    ):
+        if needs_full_pass(detections):
+            escalate.append(position)
+        else:
+            results_by_position[position] = (
+                image_path, summarize_detections(image_path, detections, model.names)
+            )
+
+    escalate.sort()
+    for position, image_path, detections in predict_images(
+        [image_paths[position] for position in escalate], model, batch_size, prefetch_workers
+    ):
+        results_by_position[escalate[position]] = (
+            image_path, summarize_detections(image_path, detections, model.names)
+        )
+
+    detected = [results_by_position[position] for position in sorted(results_by_position)]
+    return detected, len(escalate)
+
+
+# =========================
+# Multi-process Inference
+# =========================
+
+@contextmanager
+def worker_thread_limit(threads: int):
+    """
+    Set OMP_NUM_THREADS for worker processes spawned inside the block.
+
+    Spawned workers import torch (through this module) before their
+    initializer runs, and OpenMP reads the variable only at import, so it
+    has to be in the environment they inherit. The parent's value is
+    restored afterwards.
+
+    Args:
+        threads (int): OpenMP threads per worker
+    """
+    previous = os.environ.get("OMP_NUM_THREADS")
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ["OMP_NUM_THREADS"]
+        else:
+            os.environ["OMP_NUM_THREADS"] = previous
+
+
+def init_worker(threads: int):
+    """
+    Limit torch threads and load the model once per worker process.
+
+    Args:
+        threads (int): Intra-op threads torch may use in this worker
+    """
+    import torch
+
+    torch.set_num_threads(threads)
+    get_model()
+
+
+def detect_shard(image_paths: list, batch_size: int, prefetch_workers: int, fast: bool) -> list:
+    """Run detection on one shard inside a worker process."""
+    return detect_images_local(image_paths, batch_size, prefetch_workers, fast)
+
+
+def detect_parallel(
+    image_paths: list,
+    batch_size: int,
+    prefetch_workers: int,
+    workers: int,
+    threads_per_worker: int = None,
+    shard_size: int = None,
+    fast: bool = False
+) -> list:
+    """
+    Shard images across worker processes and merge results in input order.
+
+    Shards are handed out as workers free up and their results streamed back,
+    with a bounded number of shards in flight. Output order never depends on
+    which worker finishes first.
+
+    Args:
+        image_paths (list): Images to run detection on
+        batch_size (int): Images per inference call inside each worker
+        prefetch_workers (int): Decoding threads per worker
+        workers (int): Worker processes
+        threads_per_worker (int): Torch threads per worker. Defaults to
+            YoloConfig.THREADS_PER_WORKER, or CPU cores / workers if 0.
+        shard_size (int): Images per shard. Defaults to YoloConfig.SHARD_SIZE.
+        fast (bool): Use the fast categorization mode
+
+    Returns:
+        list: (image_path, result row) pairs in image_paths order
+    """
+    threads_per_worker = threads_per_worker or YoloConfig.THREADS_PER_WORKER
+    if not threads_per_worker:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    shard_size = shard_size or YoloConfig.SHARD_SIZE
+
+    shards = [
+        image_paths[start:start + shard_size]
+        for start in range(0, len(image_paths), shard_size)
+    ]
+    print(
+        f"🧵 {workers} workers x {threads_per_worker} threads, "
+        f"{len(shards)} shards of up to {shard_size} images"
+    )
+
+    results_by_shard = {}
+    max_in_flight = 2 * workers
+
+    # Spawn so workers don't inherit the parent's torch thread pools
+    with worker_thread_limit(threads_per_worker), ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(threads_per_worker,)
+    ) as executor:
+        remaining = iter(enumerate(shards))
+        running = {}
+
+        while True:
+            while len(running) < max_in_flight:
+                item = next(remaining, None)
+                if item is None:
+                    break
+                index, shard = item
+                running[executor.submit(detect_shard, shard, batch_size, prefetch_workers, fast)] = index
+
+            if not running:
+                break
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                results_by_shard[index] = future.result()
+
+    return [
+        detected
+        for index in sorted(results_by_shard)
+        for detected in results_by_shard[index]
+    ]
+
+
+def detect_images(
+    image_paths: list,
+    batch_size: int,
+    prefetch_workers: int,
+    workers: int = 1,
+    fast: bool = False
+) -> list:
+    """
+    Run detection on a list of images in this process or across workers.
+
+    Args:
+        image_paths (list): Images to run detection on
+        batch_size (int): Images per inference call; 1 runs one call per image
+        prefetch_workers (int): Decoding threads in batched mode
+        workers (int): Worker processes; 1 runs in this process
+        fast (bool): Use the fast categorization mode
+
+    Returns:
+        list: (image_path, result row) pairs in image_paths order
+    """
+    if workers > 1 and len(image_paths) > 1:
+        return detect_parallel(image_paths, batch_size, prefetch_workers, workers, fast=fast)
+    return detect_images_local(image_paths, batch_size, prefetch_workers, fast)
+
+
+def detect_with_cache(
+    image_paths: list,
+    batch_size: int,
+    prefetch_workers: int,
+    workers: int = 1,
+    fast: bool = False
+) -> list:
+    """
+    Run detection only on images missing from the detection cache.
+
+    Images are identified by content hash, so renamed or reposted copies of
+    an image already seen reuse its cached result. New results are stored and
+    merged with the cached ones.
 
+    Args:
+        image_paths (list): All images to produce results for
+        batch_size (int): Images per inference call
+        prefetch_workers (int): Decoding threads in batched mode
+        workers (int): Inference worker processes
+        fast (bool): Use the fast categorization mode
+
+    Returns:
+        list: (image_path, result row) pairs in image_paths order
+    """
+    with DetectionCache(YoloConfig.CACHE_PATH, model_key(fast)) as cache:
+        hashes = cache.content_hashes(image_paths)
+        cached = cache.lookup(hashes.values())
+
+        # Infer each unseen content hash once
+        to_detect = {}
+        for image_path in image_paths:
+            content_hash = hashes[image_path]
+            if content_hash not in cached and content_hash not in to_detect:
+                to_detect[content_hash] = image_path
+
+        from_cache = sum(1 for image_path in image_paths if hashes[image_path] in cached)
+        print(
+            f"♻️ {from_cache} images served from cache, "
+            f"{len(image_paths) - from_cache - len(to_detect)} duplicates of new images, "
+            f"{len(to_detect)} to run through YOLO "
+            f"({cache.hashed} hashed, {cache.hash_reused} hashes reused)"
+        )
+
+        if to_detect:
+            detected = detect_images(list(to_detect.values()), batch_size, prefetch_workers, workers, fast)
+            new_results = [(hashes[image_path], *row[1:]) for image_path, row in detected]
+            cache.store(new_results)
+            cached.update((content_hash, tuple(result)) for content_hash, *result in new_results)
+
+    return [
+        (image_path, [image_path.name, *cached[hashes[image_path]]])
+        for image_path in image_paths
+        if hashes[image_path] in cached
+    ]
+
+
+# =========================
+# Near-duplicate Grouping
+# =========================
+
+def group_images(image_paths: list, workers: int) -> dict:
+    """
+    Group perceptually near-duplicate images and report the savings.
+
+    Args:
+        image_paths (list): Images to group
+        workers (int): Threads hashing new images
+
+    Returns:
+        dict: Image path -> representative image path of its group
+    """
+    with PerceptualHashIndex(YoloConfig.CACHE_PATH) as index:
+        hashes = index.hashes(image_paths, workers)
+        print(f"🖼️ Perceptual hashes: {index.computed} computed, {index.reused} reused")
+
+    groups = group_near_duplicates(hashes, YoloConfig.DEDUP_MAX_DISTANCE)
+    stats = dedup_stats(groups)
+    print(
+        f"🪞 {stats['images']} images in {stats['groups']} groups: "
+        f"{stats['duplicates']} near-duplicates across {stats['groups_with_duplicates']} groups, "
+        f"{stats['inference_saved']:.1%} of inference saved, "
+        f"{stats['duplicate_bytes'] / 1024 / 1024:.1f} MB held by duplicate copies"
+    )
+    return groups
+
+
+# =========================
+# Core Detection Logic
+# =========================
+
+def scan_images() -> list:
+    """
+    Find the images to run detection on, reporting what was found.
+
+    Returns:
+        list: Image paths, empty if there is nothing to do
+    """
     print(f"🔍 Scanning images in: {IMAGE_DIR.resolve()}")
 
     if not IMAGE_DIR.exists():
         print("❌ IMAGE_DIR does not exist. Check your path.")
-        return results_data
+        return []
 
-    # Collect all images recursively
-    image_paths = []
-    for ext in IMAGE_EXTENSIONS:
-        image_paths.extend(IMAGE_DIR.rglob(ext))
+    image_paths = collect_image_paths()
 
     if not image_paths:
         print("⚠️ No images found. Check IMAGE_DIR path or image formats.")
-        return results_data
+        return []
 
     print(f"📸 Found {len(image_paths)} images. Running YOLO detection...")
-    
-    # Load model only when actually needed
-    model = get_model()
+    return image_paths
 
-    for image_path in image_paths:
-        detections = model(image_path, verbose=False)[0]
 
-        detected_objects = set()
-        confidence_scores = []
-
-        if detections.boxes is not None:
-            for box in detections.boxes:
-                class_name = model.names[int(box.cls)]
-                confidence = float(box.conf)
+def run_detection(
+    batch_size: int = None,
+    prefetch_workers: int = None,
+    use_cache: bool = None,
+    workers: int = None,
+    fast: bool = None,
+    dedup: bool = None
+):
+    """
+    Run YOLOv8 object detection on all images in the data lake.
 
-                detected_objects.add(class_name)
-                confidence_scores.append(confidence)
+    Args:
+        batch_size (int): Images per inference call. Defaults to
+            YoloConfig.BATCH_SIZE; 1 runs the original per-image loop.
+        prefetch_workers (int): Threads decoding upcoming images in batched
+            mode. Defaults to YoloConfig.PREFETCH_WORKERS.
+        use_cache (bool): Reuse cached detections of unchanged images.
+            Defaults to YoloConfig.USE_CACHE.
+        workers (int): Inference worker processes, each loading the model
+            once. Defaults to YoloConfig.WORKERS; 1 runs in this process.
+        fast (bool): Categorize with a class-restricted, low-resolution pass
+            and escalate uncertain images. Defaults to YoloConfig.FAST_MODE.
+        dedup (bool): Run detection once per group of perceptually
+            near-duplicate images and copy the result to every member.
+            Defaults to YoloConfig.DEDUP.
 
-        image_category = classify_image(detected_objects)
+    Returns:
+        list: Detection results
+    """
+    results_data = []
+    batch_size = batch_size or YoloConfig.BATCH_SIZE
+    prefetch_workers = prefetch_workers or YoloConfig.PREFETCH_WORKERS
+    use_cache = YoloConfig.USE_CACHE if use_cache is None else use_cache
+    workers = workers or YoloConfig.WORKERS
+    fast = YoloConfig.FAST_MODE if fast is None else fast
+    dedup = YoloConfig.DEDUP if dedup is None else dedup
+
+    image_paths = scan_images()
+    if not image_paths:
+        return results_data
 
-        avg_confidence = round(
-            sum(confidence_scores) / len(confidence_scores), 3
-        ) if confidence_scores else 0.0
+    to_detect = image_paths
+    if dedup:
+        groups = group_images(image_paths, prefetch_workers)
+        to_detect = list(dict.fromkeys(groups.values()))
 
-        results_data.append([
-            image_path.name,
-            ",".join(sorted(detected_objects)),
-            image_category,
-            avg_confidence
-        ])
+    if use_cache:
+        detected = detect_with_cache(to_detect, batch_size, prefetch_workers, workers, fast)
+    else:
+        detected = detect_images(to_detect, batch_size, prefetch_workers, workers, fast)
+
+    if dedup:
+        # Fan each group's result out to all of its members
+        by_representative = dict(detected)
+        results_data = [
+            [image_path.name, *by_representative[groups[image_path]][1:]]
+            for image_path in image_paths
+            if groups[image_path] in by_representative
+        ]
+    else:
+        results_data = [row for _, row in detected]
 
     print("✅ Object detection completed successfully.")
     return results_data
 
 
+# =========================
+# Per-box Output
+# =========================
+
+def run_box_detection(batch_size: int = None, prefetch_workers: int = None):
+    """
+    Run full-pass detection and stream per-box rows straight into PostgreSQL.
+
+    Each image is written to raw.yolo_images and each of its boxes to
+    raw.yolo_boxes as soon as its batch is inferred, with no CSV in between.
+    Images already loaded with the same content hash and model are skipped.
+    Inference runs in this process; the fast mode and worker processes are
+    not used here since they would hold results back or drop boxes.
+
+    Args:
+        batch_size (int): Images per inference call. Defaults to YoloConfig.BATCH_SIZE.
+        prefetch_workers (int): Threads decoding upcoming images in batched
+            mode. Defaults to YoloConfig.PREFETCH_WORKERS.
+    """
+    batch_size = batch_size or YoloConfig.BATCH_SIZE
+    prefetch_workers = prefetch_workers or YoloConfig.PREFETCH_WORKERS
+    key = model_key()
+
+    image_paths = scan_images()
+    if not image_paths:
+        return
+
+    with DetectionCache(YoloConfig.CACHE_PATH, key) as cache:
+        hashes = cache.content_hashes(image_paths)
+
+    conn = psycopg2.connect(**DatabaseConfig.get_connection_params())
+    try:
+        loader = YoloBoxLoader(conn, YoloConfig.BOX_BATCH_SIZE)
+        loaded = loader.loaded_hashes(key)
+        to_detect = [
+            image_path for image_path in image_paths
+            if loaded.get((image_path.parent.name, image_path.name)) != hashes[image_path]
+        ]
+        print(f"♻️ {len(image_paths) - len(to_detect)} images already loaded, {len(to_detect)} to run through YOLO")
+
+        start = time.perf_counter()
+        if to_detect:
+            model = get_model()
+            for _, image_path, detections in predict_images(
+                to_detect, model, batch_size, prefetch_workers
+            ):
+                loader.add(
+                    image_path.parent.name,
+                    image_path.name,
+                    hashes[image_path],
+                    key,
+                    extract_boxes(detections, model.names)
+                )
+        loader.close()
+        elapsed = time.perf_counter() - start
+    finally:
+        conn.close()
+
+    rate = loader.images_loaded / elapsed if elapsed else 0.0
+    print(
+        f"✅ Streamed {loader.images_loaded} images and {loader.boxes_loaded} boxes "
+        f"into raw.yolo_images / raw.yolo_boxes in {elapsed:.2f}s ({rate:.1f} images/sec)"
+    )
+
+
 # =========================
 # Save Results
 # =========================
@@ -152,5 +885,32 @@ def save_to_csv(data):
 # =========================
 
 if __name__ == "__main__":
-    results = run_detection()
-    save_to_csv(results)
+    parser = argparse.ArgumentParser(description="Run YOLO object detection on scraped images")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Images per inference call (1 = one image per call)")
+    parser.add_argument("--prefetch-workers", type=int, default=None,
+                        help="Threads decoding images ahead of inference")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Inference worker processes (1 = in-process)")
+    parser.add_argument("--fast", action="store_true", default=None,
+                        help="Class-restricted, reduced-resolution categorization with escalation")
+    parser.add_argument("--dedup", action="store_true", default=None,
+                        help="Run detection once per group of near-duplicate images")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Run inference on every image, ignoring the detection cache")
+    parser.add_argument("--output", choices=["csv", "postgres"], default=YoloConfig.OUTPUT,
+                        help="Write the image-level CSV or stream per-box rows into PostgreSQL")
+    args = parser.parse_args()
+
+    if args.output == "postgres":
+        run_box_detection(batch_size=args.batch_size, prefetch_workers=args.prefetch_workers)
+    else:
+        results = run_detection(
+            batch_size=args.batch_size,
+            prefetch_workers=args.prefetch_workers,
+            use_cache=False if args.no_cache else None,
+            workers=args.workers,
+            fast=args.fast,
+            dedup=args.dedup
+        )
+        save_to_csv(results)